@@ -1,11 +1,17 @@
 import streamlit as st
-import yfinance as yf
 import pandas as pd
-import numpy as np
 import plotly.graph_objects as go
-import requests
-import time
-from datetime import datetime, timedelta, timezone
+import os
+import json
+from datetime import datetime
+from scanner import DEFAULT_TICKERS, find_order_blocks, get_trading_setup, load_metadata_store, parse_tickers, run_scan
+from scan_engine import ScanFailure
+from snapshot import latest_snapshot, load_snapshot
+from shared_scan import SharedScanStore
+from result_store import export_table, filter_table, with_metadata
+from streaming import LIVE_INTERVAL, start_live
+from gemini_client import GeminiClient
+from profiling import ScanProfile
 
 # --- KONFIGURASI HALAMAN ---
 st.set_page_config(page_title="StockScreener Pro: SMC Dark Terminal", layout="wide")
@@ -19,6 +25,9 @@ USERS = {
     "investor2": "bluechip99"
 }
 
+# --- KONFIGURASI SCAN BERSAMA ---
+SHARED_SCAN_TTL = int(os.environ.get("SHARED_SCAN_TTL", 300))  # detik hasil scan dipakai ulang antar sesi
+
 # --- KONFIGURASI API GEMINI ---
 API_KEY = "" # API Key disediakan oleh lingkungan eksekusi
 
@@ -84,27 +93,71 @@ st.markdown("""
 </style>
 """, unsafe_allow_html=True)
 
+# --- STORE METADATA (BERSAMA UNTUK SEMUA SESI) ---
+@st.cache_resource
+def get_metadata_store():
+    return load_metadata_store()
+
+# --- HASIL SCAN BERSAMA (SATU SALINAN UNTUK SEMUA SESI) ---
+@st.cache_resource
+def get_scan_store():
+    return SharedScanStore(max_age=SHARED_SCAN_TTL)
+
+@st.cache_resource(show_spinner=False, max_entries=2)
+def cached_snapshot(path):
+    # Snapshot scan_cli.py; dibagi antar sesi tanpa disalin, jadi jangan diubah di tempat.
+    table, history, summary, scanned_at = load_snapshot(path)
+    return table, history, tuple(ScanFailure(**f) for f in summary['failed']), scanned_at, summary.get('profile')
+
+# --- MODE LIVE (STATE INDIKATOR INKREMENTAL, BERSAMA UNTUK SEMUA SESI) ---
+@st.cache_resource(show_spinner="Menyiapkan mode live...", max_entries=4)
+def get_live_scanner(t_list):
+    return start_live(list(t_list), get_metadata_store())
+
+@st.fragment(run_every=LIVE_INTERVAL)
+def live_updates(t_list):
+    # Hanya ticker yang Skor / Structure-nya berubah yang diganti di tabel; app di-rerun bila ada perubahan.
+    live = get_live_scanner(t_list)
+    live.refresh()
+    version = (id(live), live.version)
+    if live.table is not None and st.session_state.get('live_version') != version:
+        st.session_state['live_version'] = version
+        st.session_state['results'] = live.table
+        st.session_state['history'] = live  # frame(): riwayat seed + bar selama mode live
+        st.session_state['ts'] = live.updated_at.strftime("%H:%M:%S WIB") + " (live)"
+        st.rerun()
+    if live.changed: st.caption(f"🔴 Live {live.updated_at:%H:%M:%S}: {len(live.changed)} ticker berubah ({', '.join(t.split('.')[0] for t in live.changed[:8])}{'...' if len(live.changed) > 8 else ''})")
+    else: st.caption(f"🔴 Live: dicek tiap {LIVE_INTERVAL} detik, belum ada perubahan Skor / Structure")
+
+# --- PANEL DIAGNOSTIK ---
+def show_diagnostics(scan_profile, ui_profile):
+    # scan_profile: ScanProfile.to_dict() dari scan terakhir (atau dari ringkasan snapshot); ui_profile: rerun ini.
+    st.divider(); st.header("⏱️ Diagnostik Performa")
+    ui = ui_profile.to_dict()
+    if not scan_profile: st.info("Belum ada profil scan (hasil live atau snapshot lama). Jalankan pemindaian untuk mengukur.")
+    else:
+        col_stage, col_lat = st.columns([2, 1])
+        with col_stage:
+            stages = pd.DataFrame({"Tahap": list(scan_profile['stages_ms']) + list(ui['stages_ms']),
+                                   "ms": list(scan_profile['stages_ms'].values()) + list(ui['stages_ms'].values())})
+            st.bar_chart(stages.set_index("Tahap"), horizontal=True)
+        with col_lat:
+            st.metric("Total Scan", f"{scan_profile['total_ms'] / 1000:.2f} s")
+            if scan_profile['latency_ms']:
+                st.caption(f"Latensi fetch per ticker ({scan_profile['tickers_timed']} ticker dari jaringan)")
+                for k, v in scan_profile['latency_ms'].items(): st.markdown(f"**{k}**: {v:,.0f} ms")
+            else: st.caption("Semua bar diambil dari cache, tidak ada latensi jaringan per ticker.")
+    st.download_button("📥 Unduh Profil (JSON)", data=json.dumps({"scan": scan_profile, "dashboard": ui}, indent=1),
+                       file_name=f"profil_scan_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json", mime="application/json")
+
 # --- FUNGSI AI GEMINI ---
+@st.cache_resource
+def get_gemini_client():
+    # Session, limiter dan cache jawaban dibagi semua sesi (GEMINI_URL / GEMINI_WORKERS / GEMINI_RATE).
+    return GeminiClient(API_KEY)
+
 def call_gemini_ai(prompt, system_instruction):
-    url = f"https://generativelanguage.googleapis.com/v1beta/models/gemini-2.5-flash-preview-09-2025:generateContent?key={API_KEY}"
-    payload = {
-        "contents": [{"parts": [{"text": prompt}]}],
-        "systemInstruction": {"parts": [{"text": system_instruction}]}
-    }
-    retries = 5
-    for i in range(retries):
-        try:
-            response = requests.post(url, json=payload, timeout=45)
-            if response.status_code == 200:
-                result = response.json()
-                text_out = result.get('candidates', [{}])[0].get('content', {}).get('parts', [{}])[0].get('text', "")
-                if text_out: return text_out
-            elif response.status_code == 429:
-                time.sleep(5)
-                continue
-        except: pass
-        time.sleep(2**i)
-    return ""
+    return get_gemini_client().generate(prompt, system_instruction)
 
 # --- FUNGSI LOGIN ---
 def login():
@@ -125,76 +178,6 @@ def login():
         return False
     return True
 
-# --- LOGIKA TEKNIKAL ---
-def calculate_rsi(data, window=14):
-    delta = data.diff()
-    gain = (delta.where(delta > 0, 0)).rolling(window=window).mean()
-    loss = (-delta.where(delta < 0, 0)).rolling(window=window).mean()
-    rs = gain / loss.replace(0, np.nan)
-    return (100 - (100 / (1 + rs))).fillna(50)
-
-def detect_market_structure(df):
-    df = df.copy()
-    window = 5
-    df['High_Swing'] = df['High'].rolling(window=window, center=True).apply(lambda x: x.max() == x[window//2])
-    highs = df[df['High_Swing'] == 1]['High']
-    last_high = highs.iloc[-2] if len(highs) > 1 else None
-    if last_high and df['Close'].iloc[-1] > last_high: return "BOS Bullish"
-    return "Sideways/Retracement"
-
-def find_order_blocks(df):
-    obs = []
-    for i in range(1, len(df)-5):
-        if df['Close'].iloc[i] < df['Open'].iloc[i]: 
-            if df['Close'].iloc[i+3] > df['High'].iloc[i] * 1.02:
-                obs.append({'type': 'Bullish OB', 'low': df['Low'].iloc[i], 'high': df['High'].iloc[i], 'index': df.index[i]})
-    return obs[-1] if obs else None
-
-def get_trading_setup(price, ob):
-    if not ob: return None
-    entry = price if price < ob['high'] * 1.03 else ob['high']
-    sl = ob['low'] * 0.992
-    risk = entry - sl
-    if risk <= 0: return None
-    return {"Entry": entry, "SL": sl, "TP": entry + (risk * 2)}
-
-def get_signals(t):
-    try:
-        ticker = yf.Ticker(t)
-        df = ticker.history(period="120d")
-        if df.empty or len(df) < 50: return None
-        df['MA20'] = df['Close'].rolling(20).mean()
-        df['MA50'] = df['Close'].rolling(50).mean()
-        df['RSI'] = calculate_rsi(df['Close'])
-        df['Avg_Vol_5'] = df['Volume'].shift(1).rolling(5).mean()
-        last = df.iloc[-1]; price = last['Close']
-        v_ratio = last['Volume'] / last['Avg_Vol_5'] if last['Avg_Vol_5'] > 0 else 0
-        struct = detect_market_structure(df)
-        
-        # Perhitungan Jarak Entry SMC
-        ob = find_order_blocks(df)
-        setup = get_trading_setup(price, ob)
-        jarak_entry = None
-        if setup:
-            jarak_entry = round(((price - setup['Entry']) / setup['Entry']) * 100, 2)
-
-        v_score = 40 if v_ratio > 2.0 else (20 if v_ratio > 1.5 else 5)
-        ma_score = 30 if price > last['MA50'] else 0
-        rsi_score = 20 if last['RSI'] < 35 else (10 if last['RSI'] < 65 else 0)
-        smc_score = 10 if struct == "BOS Bullish" else 0
-        
-        return {
-            "Ticker": t, "Nama": ticker.info.get('longName', t),
-            "Sektor": ticker.info.get('sector', 'Lainnya'), "Harga": int(round(price)),
-            "Chg %": round(((price - df.iloc[-2]['Close']) / df.iloc[-2]['Close']) * 100, 2),
-            "Skor": int(v_score + ma_score + rsi_score + smc_score),
-            "Jarak Entry (%)": jarak_entry,
-            "Vol Ratio": round(v_ratio, 2), "RSI": round(last['RSI'], 1),
-            "Structure": struct, "MA20": "Bullish ✅" if price > last['MA20'] else "Bearish ❌",
-            "MA50": "Atas ⬆️" if price > last['MA50'] else "Bawah ⬇️", "df": df
-        }
-    except: return None
-
 # --- UI UTAMA ---
 if login():
     st.title("🖥️ StockScreener Pro: SMC Terminal")
@@ -204,28 +187,48 @@ if login():
         st.divider()
         st.header("1. Konfigurasi Scan")
         
-        default_tickers = "AALI, ABBA, ABDA, ABMM, ACES, ACST, ADES, ADHI, AISA, AKKU, AKPI, AKRA, AKSI, ALDO, ALKA, ALMI, ALTO, AMAG, AMFG, AMIN, AMRT, ANJT, ANTM, APEX, APIC, APII, APLI, APLN, ARGO, ARII, ARNA, ARTA, ARTI, ARTO, ASBI, ASDM, ASGR, ASII, ASJT, ASMI, ASRI, ASRM, ASSA, ATIC, AUTO, BABP, BACA, BAJA, BALI, BAPA, BATA, BAYU, BBCA, BBHI, BBKP, BBLD, BBMD, BBNI, BBRI, BBRM, BBTN, BBYB, BCAP, BCIC, BCIP, BDMN, BEKS, BEST, BFIN, BGTG, BHIT, BIKA, BIMA, BINA, BIPI, BIPP, BIRD, BISI, BJBR, BJTM, BKDP, BKSL, BKSW, BLTA, BLTZ, BMAS, BMRI, BMSR, BMTR, BNBA, BNBR, BNGA, BNII, BNLI, BOLT, BPFI, BPII, BRAM, BRMS, BRNA, BRPT, BSDE, BSIM, BSSR, BSWD, BTEK, BTEL, BTON, BTPN, BUDI, BUKK, BULL, BUMI, BUVA, BVIC, BWPT, BYAN, CANI, CASS, CEKA, CENT, CFIN, CINT, CITA, CLPI, CMNP, CMPP, CNKO, CNTX, COWL, CPIN, CPRO, CSAP, CTBN, CTRA, CTTH, DART, DEFI, DEWA, DGIK, DILD, DKFT, DLTA, DMAS, DNAR, DNET, DOID, DPNS, DSFI, DSNG, DSSA, DUTI, DVLA, DYAN, ECII, EKAD, ELSA, ELTY, EMDE, EMTK, ENRG, EPMT, ERAA, ERTX, ESSA, ESTI, ETWA, EXCL, FAST, FASW, FISH, FMII, FORU, FPNI, GAMA, GDST, GDYR, GEMA, GEMS, GGRM, GIAA, GJTL, GLOB, GMTD, GOLD, GOLL, GPRA, GSMF, GTBO, GWSA, GZCO, HADE, HDFA, HERO, HEXA, HITS, HMSP, HOME, HOTL, HRUM, IATA, IBFN, IBST, ICBP, ICON, IGAR, IIKP, IKAI, IKBI, IMAS, IMJS, IMPC, INAF, INAI, INCI, INCO, INDF, INDR, INDS, INDX, INDY, INKP, INPC, INPP, INRU, INTA, INTD, INTP, IPOL, ISAT, ISSP, ITMA, ITMG, JAWA, JECC, JIHD, JKON, JPFA, JRPT, JSMR, JSPT, JTPE, KAEF, KARW, KBLI, KBLM, KBLV, KBRI, KDSI, KIAS, KICI, KIJA, KKGI, KLBF, KOBX, KOIN, KONI, KOPI, KPIG, KRAS, KREN, LAPD, LCGP, LEAD, LINK, LION, LMAS, LMPI, LMSH, LPCK, LPGI, LPIN, LPKR, LPLI, LPPF, LPPS, LRNA, LSIP, LTLS, MAGP, MAIN, MAPI, MAYA, MBAP, MBSS, MBTO, MCOR, MDIA, MDKA, MDLN, MDRN, MEDC, MEGA, MERK, META, MFMI, MGNA, MICE, MIDI, MIKA, MIRA, MITI, MKPI, MLBI, MLIA, MLPL, MLPT, MMLP, MNCN, MPMX, MPPA, MRAT, MREI, MSKY, MTDL, MTFN, MTLA, MTSM, MYOH, MYOR, MYTX, NELY, NIKL, NIRO, NISP, NOBU, NRCA, OCAP, OKAS, OMRE, PADI, PALM, PANR, PANS, PBRX, PDES, PEGE, PGAS, PGLI, PICO, PJAA, PKPK, PLAS, PLIN, PNBN, PNBS, PNIN, PNLF, PNSE, POLY, POOL, PPRO, PSAB, PSDN, PSKT, PTBA, PTIS, PTPP, PTRO, PTSN, PTSP, PUDP, PWON, PYFA, RAJA, RALS, RANC, RBMS, RDTX, RELI, RICY, RIGS, RIMO, RODA, ROTI, RUIS, SAFE, SAME, SCCO, SCMA, SCPI, SDMU, SDPC, SDRA, SGRO, SHID, SIDO, SILO, SIMA, SIMP, SIPD, SKBM, SKLT, SKYB, SMAR, SMBR, SMCB, SMDM, SMDR, SMGR, SMMA, SMMT, SMRA, SMRU, SMSM, SOCI, SONA, SPMA, SQMI, SRAJ, SRIL, SRSN, SRTG, SSIA, SSMS, SSTM, STAR, STTP, SUGI, SULI, SUPR, TALF, TARA, TAXI, TBIG, TBLA, TBMS, TCID, TELE, TFCO, TGKA, TIFA, TINS, TIRA, TIRT, TKIM, TLKM, TMAS, TMPO, TOBA, TOTL, TOTO, TOWR, TPIA, TPMA, TRAM, TRIL, TRIM, TRIO, TRIS, TRST, TRUS, TSPC, ULTJ, UNIC, UNIT, UNSP, UNTR, UNVR, VICO, VINS, VIVA, VOKS, VRNA, WAPO, WEHA, WICO, WIIM, WIKA, WINS, WOMF, WSKT, WTON, YPAS, YULE, ZBRA, SHIP, CASA, DAYA, DPUM, IDPR, JGLE, KINO, MARI, MKNT, MTRA, OASA, POWR, INCF, WSBP, PBSA, PRDA, BOGA, BRIS, PORT, CARS, MINA, CLEO, TAMU, CSIC, TGRA, FIRE, TOPS, KMTR, ARMY, MAPB, WOOD, HRTA, MABA, HOKI, MPOW, MARK, NASA, MDKI, BELL, KIOS, GMFI, MTWI, ZINC, MCAS, PPRE, WEGE, PSSI, MORA, DWGL, PBID, JMAS, CAMP, IPCM, PCAR, LCKM, BOSS, HELI, JSKY, INPS, GHON, TDPM, DFAM, NICK, BTPS, SPTO, PRIM, HEAL, TRUK, PZZA, TUGU, MSIN, SWAT, TNCA, MAPA, TCPI, IPCC, RISE, BPTR, POLL, NFCX, MGRO, NUSA, FILM, ANDI, LAND, MOLI, PANI, DIGI, CITY, SAPX, SURE, HKMU, MPRO, DUCK, GOOD, SKRN, YELO, CAKK, SATU, SOSS, DEAL, POLA, DIVA, LUCK, URBN, SOTS, ZONE, PEHA, FOOD, BEEF, POLI, CLAY, NATO, JAYA, COCO, MTPS, CPRI, HRME, POSA, JAST, FITT, BOLA, CCSI, SFAN, POLU, KJEN, KAYU, ITIC, PAMG, IPTV, BLUE, ENVY, EAST, LIFE, FUJI, KOTA, INOV, ARKA, SMKL, HDIT, KEEN, BAPI, TFAS, GGRP, OPMS, NZIA, SLIS, PURE, IRRA, DMMX, SINI, WOWS, ESIP, TEBE, KEJU, PSGO, AGAR, IFSH, REAL, IFII, PMJS, UCID, GLVA, PGJO, AMAR, CSRA, INDO, AMOR, TRIN, DMND, PURA, PTPW, TAMA, IKAN, SAMF, SBAT, KBAG, CBMF, RONY, CSMI, BBSS, BHAT, CASH, TECH, EPAC, UANG, PGUN, SOFA, PPGL, TOYS, SGER, TRJA, PNGO, SCNP, BBSI, KMDS, PURI, SOHO, HOMI, ROCK, ENZO, PLAN, PTDU, ATAP, VICI, PMMP, BANK, WMUU, EDGE, UNIQ, BEBS, SNLK, ZYRX, LFLO, FIMP, TAPG, NPGF, LUCY, ADCP, HOPE, MGLV, TRUE, LABA, ARCI, IPAC, MASB, BMHS, FLMC, NICL, UVCR, BUKA, HAIS, OILS, GPSO, MCOL, RSGK, RUNS, SBMA, CMNT, GTSI, IDEA, KUAS, BOBA, MTEL, DEPO, BINO, CMRY, WGSH, TAYS, WMPP, RMKE, OBMD, AVIA, IPPE, NASI, BSML, DRMA, ADMR, SEMA, ASLC, NETV, BAUT, ENAK, NTBK, SMKM, STAA, NANO, BIKE, WIRG, SICO, GOTO, TLDN, MTMH, WINR, IBOS, OLIV, ASHA, SWID, TRGU, ARKO, CHEM, DEWI, AXIO, KRYA, HATM, RCCC, GULA, JARR, AMMS, RAFI, KKES, ELPI, EURO, KLIN, TOOL, BUAH, CRAB, MEDS, COAL, PRAY, CBUT, BELI, MKTR, OMED, BSBK, PDPP, KDTN, ZATA, NINE, MMIX, PADA, ISAP, VTNY, SOUL, ELIT, BEER, CBPE, SUNI, CBRE, WINE, BMBL, PEVE, LAJU, FWCT, NAYZ, IRSX, PACK, VAST, CHIP, HALO, KING, PGEO, FUTR, HILL, BDKR, PTMP, SAGE, TRON, CUAN, NSSS, GTRA, HAJJ, JATI, TYRE, MPXL, SMIL, KLAS, MAXI, VKTR, RELF, AMMN, CRSN, GRPM, WIDI, TGUK, INET, MAHA, RMKO, CNMA, FOLK, HBAT, GRIA, PPRI, ERAL, CYBR, MUTU, LMAX, HUMI, MSIE, RSCH, BABY, AEGS, IOTF, KOCI, PTPS, BREN, STRK, KOKA, LOPI, UDNG, RGAS, MSTI, IKPM, AYAM, SURI, ASLI, GRPH, SMGA, UNTD, TOSK, MPIX, ALII, MKAP, MEJA, LIVE, HYGN, BAIK, VISI, AREA, MHKI, ATLA, DATA, SOLA, BATR, SPRE, PART, GOLF, ISEA, BLESS, GUNA, LABS, DOSS, NEST, PTMR, VERN, DAAZ, BOAT, NAIK, AADI, MDIY, KSIX, RATU, YOII, HGII, BRRC, DGWG, CBDK, OBAT, MINES, ASPR, PSAT, COIN, CDIA, BLOG, MERI, CHEK, PMUI, EMAS, PJHB, RLCO, SUPA, KAQI, YUPI, FORE, MDLA, DKHH, AYLS, DADA, ASPI, ESTA, BESS, AMAN, CARE, PIPA, NCKL, MENN, AWAN, MBMA, RAAM, DOOH, CGAS, NICE, MSJA, SMLE, ACRO, MANG, WIFI, FAPA, DCII, KETR, DGNS, UFOE, ADMF, ADMG, ADRO, AGII, AGRO, AGRS, AHAP, AIMS"
-        input_t = st.text_area("Daftar Ticker (BEI):", default_tickers, height=120)
+        input_t = st.text_area("Daftar Ticker (BEI):", DEFAULT_TICKERS, height=120)
         
         if st.button("Jalankan Pemindaian"):
-            t_list = [t.strip().upper() + (".JK" if "." not in t else "") for t in input_t.split(",") if t.strip()]
-            res = []; prog_bar = st.progress(0); status_text = st.empty()
-            for idx, t in enumerate(t_list):
-                status_text.text(f"Scanning: {t}")
-                sig = get_signals(t)
-                if sig: res.append(sig)
-                prog_bar.progress((idx + 1) / len(t_list))
-            st.session_state['results'] = res
-            st.session_state['ts'] = datetime.now(timezone(timedelta(hours=7))).strftime("%H:%M:%S WIB")
+            t_list = parse_tickers(input_t)
+            prog_bar = st.progress(0); status_text = st.empty()
+            def on_progress(done, total, _):
+                status_text.text(f"Scanning: {done}/{total}"); prog_bar.progress(done / total if total else 1.0)
+            def on_wait(done, total):
+                status_text.text(f"Menunggu scan yang sedang berjalan... {done}/{total}")
+                if total: prog_bar.progress(done / total)
+            meta = get_metadata_store()
+            scan = get_scan_store().get_or_scan(t_list, lambda tl, prog, status: run_scan(tl, meta, status, prog), on_progress, on_wait, status_text.text)
+            st.session_state['results'] = scan.table; st.session_state['history'] = scan.history
+            st.session_state['failures'] = scan.failures
+            st.session_state['profile'] = scan.profile.to_dict() if scan.profile else None
+            st.session_state['ts'] = scan.scanned_at.strftime("%H:%M:%S WIB")
             status_text.text("Scan Selesai!")
 
-        if 'results' in st.session_state and st.session_state['results']:
+        if st.toggle("🔴 Mode Live (intraday)", help=f"Perbarui Skor & Structure dari bar intraday tiap {LIVE_INTERVAL} detik"):
+            live_updates(tuple(parse_tickers(input_t)))
+
+        if 'results' not in st.session_state and (snap := latest_snapshot()):
+            table, history, failures, scanned_at, profile = cached_snapshot(snap)
+            st.session_state['results'] = table; st.session_state['history'] = history
+            st.session_state['failures'] = failures; st.session_state['profile'] = profile
+            st.session_state['ts'] = scanned_at.strftime("%d/%m %H:%M:%S WIB") + " (snapshot terjadwal)"
+
+        if st.session_state.get('failures'):
+            with st.expander(f"⚠️ {len(st.session_state['failures'])} ticker gagal dipindai"):
+                st.dataframe(pd.DataFrame([vars(f) for f in st.session_state['failures']]), hide_index=True, use_container_width=True)
+
+        ui_profile = ScanProfile()  # waktu persiapan data & render dashboard untuk rerun ini
+        if st.session_state.get('results') is not None and len(st.session_state['results']):
             st.divider(); st.header("2. Filter Dashboard")
-            df_full = pd.DataFrame(st.session_state['results'])
+            meta = get_metadata_store()  # nama/sektor bisa terisi belakangan oleh refresh background
+            with ui_profile.stage("dashboard_data"): df_full = with_metadata(st.session_state['results'], meta)
             f_sektor = st.multiselect("Filter Sektor:", sorted(df_full['Sektor'].unique()), default=df_full['Sektor'].unique())
             f_min_score = st.slider("Skor Minimal:", 0, 100, 0)
-            filtered = df_full[(df_full['Sektor'].isin(f_sektor)) & (df_full['Skor'] >= f_min_score)]
+            with ui_profile.stage("dashboard_data"): filtered = filter_table(df_full, f_sektor, f_min_score)
         else: filtered = pd.DataFrame()
+        st.divider()
+        show_diag = st.checkbox("⏱️ Panel Diagnostik", help="Waktu per tahap scan, persentil latensi per ticker dan ekspor JSON")
 
     if not filtered.empty:
         st.caption(f"📅 Terakhir Diperbarui: {st.session_state['ts']}")
@@ -237,7 +240,7 @@ if login():
         st.divider()
         col_btn1, col_btn2 = st.columns([1, 1])
         with col_btn1:
-            csv = filtered.drop(columns=['df', 'Nama']).to_csv(index=False).encode('utf-8')
+            with ui_profile.stage("csv"): csv = export_table(filtered.drop(columns=['Nama'])).to_csv(index=False).encode('utf-8')
             st.download_button("📥 Unduh Tabel (CSV)", data=csv, file_name=f"scan_{datetime.now().strftime('%Y%m%d')}.csv", mime="text/csv")
         with col_btn2:
             if st.button("🤖 Analisis Gemini (Golden Criteria Only)"):
@@ -252,20 +255,18 @@ if login():
                 if golden_picks.empty:
                     st.warning("Tidak ada saham yang memenuhi semua Golden Criteria (BOS Bullish + MA50 + RSI 50-90 + Vol Spike). AI tidak dijalankan.")
                 else:
-                    batch_size = 20; all_nominations = []
-                    data_to_send = golden_picks.drop(columns=['df'])
-                    total_batches = (len(data_to_send) // batch_size) + (1 if len(data_to_send) % batch_size != 0 else 0)
+                    batch_size = 20
+                    data_to_send = export_table(golden_picks)
                     prog_ai = st.progress(0); status_ai = st.empty()
-                    
-                    for i in range(0, len(data_to_send), batch_size):
-                        batch_idx = (i // batch_size) + 1
-                        status_ai.text(f"Menganalisis Golden Batch {batch_idx}/{total_batches}...")
-                        chunk = data_to_send.iloc[i:i+batch_size].to_string()
-                        sys_inst = "Anda adalah Senior Technical Analyst. Anda menerima daftar saham 'Golden Setup'. Calonkan saham terbaik dan berikan alasan tajam."
-                        nominasi = call_gemini_ai(f"Analisis batch layak ini:\n{chunk}", sys_inst)
-                        if nominasi: all_nominations.append(nominasi)
-                        prog_ai.progress(batch_idx / (total_batches + 1))
-                    
+                    sys_inst = "Anda adalah Senior Technical Analyst. Anda menerima daftar saham 'Golden Setup'. Calonkan saham terbaik dan berikan alasan tajam."
+                    jobs = [(f"Analisis batch layak ini:\n{data_to_send.iloc[i:i+batch_size].to_string()}", sys_inst) for i in range(0, len(data_to_send), batch_size)]
+                    def on_ai_progress(done, total, _):
+                        status_ai.text(f"Menganalisis Golden Batch {done}/{total}..."); prog_ai.progress(done / (total + 1))
+                    # Batch dikirim paralel; batch yang pernah dianalisis (scan sama) langsung diambil dari cache.
+                    status_ai.text(f"Menganalisis {len(jobs)} Golden Batch...")
+                    nominations, _ = get_gemini_client().generate_many(jobs, on_ai_progress)
+                    all_nominations = [n for n in nominations if n]
+
                     if not all_nominations:
                         st.session_state['ai_analysis'] = "AI gagal menemukan nominasi yang cukup kuat dari data yang diberikan."
                     else:
@@ -285,29 +286,31 @@ if login():
         
         # Penyiapan Dataframe dengan Styling Warna Hijau untuk Jarak Entry <= 2%
         def highlight_near_entry(val):
-            if val is not None and val <= 2.0:
+            if pd.notna(val) and val <= 2.0:
                 return 'background-color: #064e3b; color: #34d399; font-weight: bold;'
             return ''
 
-        styled_df = filtered.drop(columns=['df', 'Nama']).sort_values(by="Skor", ascending=False).style.applymap(
-            highlight_near_entry, subset=['Jarak Entry (%)']
-        )
+        with ui_profile.stage("render_tabel"):
+            styled_df = filtered.drop(columns=['Nama']).style.applymap(
+                highlight_near_entry, subset=['Jarak Entry (%)']
+            )
 
-        event = st.dataframe(
-            styled_df,
-            use_container_width=True, hide_index=True, on_select="rerun", selection_mode="single-row",
-            column_config={
-                "Skor": st.column_config.ProgressColumn("Skor", min_value=0, max_value=100, format="%d"),
-                "Chg %": st.column_config.NumberColumn("Change", format="%.2f%%"),
-                "Vol Ratio": st.column_config.NumberColumn("Vol Ratio", format="%.2fx"),
-                "Jarak Entry (%)": st.column_config.NumberColumn("Dist Entry", format="%.2f%%")
-            }
-        )
+            event = st.dataframe(
+                styled_df,
+                use_container_width=True, hide_index=True, on_select="rerun", selection_mode="single-row",
+                column_config={
+                    "Skor": st.column_config.ProgressColumn("Skor", min_value=0, max_value=100, format="%d"),
+                    "Chg %": st.column_config.NumberColumn("Change", format="%.2f%%"),
+                    "Vol Ratio": st.column_config.NumberColumn("Vol Ratio", format="%.2fx"),
+                    "RSI": st.column_config.NumberColumn("RSI", format="%.1f"),
+                    "Jarak Entry (%)": st.column_config.NumberColumn("Dist Entry", format="%.2f%%")
+                }
+            )
 
         if event.selection.rows:
-            sel_ticker = filtered.sort_values(by="Skor", ascending=False).iloc[event.selection.rows[0]]
+            sel_ticker = filtered.iloc[event.selection.rows[0]]
             st.divider(); st.header(f"🔍 Analisis Mendalam: {sel_ticker['Nama']} ({sel_ticker['Ticker']})")
-            df_chart = sel_ticker['df']; ob = find_order_blocks(df_chart); setup = get_trading_setup(sel_ticker['Harga'], ob)
+            with ui_profile.stage("chart_data"): df_chart = st.session_state['history'].frame(sel_ticker['Ticker']); ob = find_order_blocks(df_chart); setup = get_trading_setup(sel_ticker['Harga'], ob)
             col_chart, col_setup = st.columns([2, 1])
             with col_chart:
                 fig = go.Figure(data=[go.Candlestick(x=df_chart.index, open=df_chart['Open'], high=df_chart['High'], low=df_chart['Low'], close=df_chart['Close'], increasing_line_color='#22c55e', decreasing_line_color='#ef4444')])
@@ -322,12 +325,14 @@ if login():
                 st.markdown(f"""<div class="detail-box">
                     <p class="metric-label">Status Teknikal</p>
                     <p>MA50 Tren: <b>{sel_ticker['MA50']}</b></p>
-                    <p>Jarak Entry: <b>{sel_ticker['Jarak Entry (%)']}%</b></p>
-                    <p>Momentum: <b>RSI {sel_ticker['RSI']}</b></p>
+                    <p>Jarak Entry: <b>{"-" if pd.isna(sel_ticker['Jarak Entry (%)']) else f"{sel_ticker['Jarak Entry (%)']:.2f}%"}</b></p>
+                    <p>Momentum: <b>RSI {sel_ticker['RSI']:.1f}</b></p>
                     <hr style="border-color:#475569;">
                     <p class="metric-label">Struktur (SMC)</p>
                     <p>Struktur: <b>{sel_ticker['Structure']}</b></p>
                     <p>MA20 Status: <b>{sel_ticker['MA20']}</b></p>
                     <hr style="border-color:#475569;">
                     <p class="metric-label">Trading Setup (RR 1:2)</p>""" + (f"<p>Entry: <b>{round(setup['Entry'])}</b></p><p>SL: <b style='color:#ef4444;'>{round(setup['SL'])}</b></p><p>TP: <b style='color:#22c55e;'>{round(setup['TP'])}</b></p>" if setup else "<p><i>Menunggu retrace...</i></p>") + "</div>", unsafe_allow_html=True)
+
+        if show_diag: show_diagnostics(st.session_state.get('profile'), ui_profile)
     else: st.info("💡 Klik 'Jalankan Pemindaian' di sidebar untuk mulai.")
@@ -0,0 +1,251 @@
+# --- BACKTEST VEKTOR UNTUK SKOR & SETUP SMC ---
+# Memutar ulang logika pemindaian (Skor, BOS, Order Block, Entry/SL/TP RR 1:2) secara walk-forward di
+# setiap bar historis. Sinyal di bar t hanya memakai data s.d. t dan jendela `window` bar terakhir,
+# persis seperti yang dilihat pemindaian pada penutupan hari itu. Simulasi per ticker berbentuk array.
+#
+#   python backtest.py --tickers BBCA,BBRI,TLKM --period 3y
+#   python backtest.py --tickers-file universe.txt --grid min_score=50,60,70 --grid ob_break=1.01,1.02,1.03
+import argparse
+import itertools
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from indicators import MIN_BARS, compute_indicators, skor, stack_panel, volume_ratio
+from smc import order_blocks, swing_highs, trading_setup
+
+DEFAULT_PARAMS = {
+    "min_score": 60,     # Skor minimal untuk membuka posisi
+    "ob_break": 1.02,    # aturan OB 2%: close 3 bar kemudian > high OB x 1.02
+    "zone": 1.03,        # harga < high OB x 1.03 -> entry di harga sekarang, selain itu limit di high OB
+    "sl_buffer": 0.992,  # SL = low OB x 0.992
+    "rr": 2.0,           # TP = entry + risk x rr
+    "window": 80,        # jumlah bar yang dilihat pemindaian (period 120d ~ 80 bar bursa)
+    "max_wait": 5,       # bar maksimum menunggu limit entry terisi
+    "max_hold": 20,      # bar maksimum memegang posisi sebelum keluar di close
+}
+SCORE_BUCKETS = [-1, 39, 59, 79, 100]
+SCORE_LABELS = ["0-39", "40-59", "60-79", "80-100"]
+
+
+def shift_right(a, k, fill=-1):
+    out = np.full(a.shape, fill, dtype=a.dtype)
+    if k < a.shape[1]: out[:, k:] = a[:, :a.shape[1] - k]
+    return out
+
+
+def last_index(mask):
+    # Indeks True terakhir s.d. setiap bar (-1 bila belum ada).
+    ar = np.broadcast_to(np.arange(mask.shape[1]), mask.shape)
+    return np.maximum.accumulate(np.where(mask, ar, -1), axis=1)
+
+
+def walk_forward_bos(high, close, window):
+    # BOS per bar: swing high baru terkonfirmasi 2 bar setelahnya; ambil swing kedua dari belakang yang
+    # masih berada di dalam jendela pemindaian.
+    last = last_index(swing_highs(high))
+    prev = shift_right(last, 1)                               # swing terakhir sebelum bar j
+    l1 = shift_right(last, 2)                                 # swing terakhir yang terlihat di bar t
+    s2 = np.where(l1 >= 0, np.take_along_axis(prev, np.maximum(l1, 0), axis=1), -1)
+    t = np.arange(high.shape[1])
+    s2 = np.where(s2 >= t - window + 3, s2, -1)
+    level = np.take_along_axis(high, np.maximum(s2, 0), axis=1)
+    with np.errstate(invalid="ignore"):
+        return (s2 >= 0) & (level != 0) & (close > level)
+
+
+def walk_forward_ob(o, h, l, c, window, brk):
+    # Order block terakhir yang terlihat di bar t: indeks <= t-5 dan masih di dalam jendela.
+    ob = shift_right(last_index(order_blocks(o, h, l, c, brk=brk)), 5)
+    t = np.arange(c.shape[1])
+    ob = np.where(ob >= t - window + 2, ob, -1)
+    safe = np.maximum(ob, 0)
+    return (np.where(ob >= 0, np.take_along_axis(l, safe, axis=1), np.nan),
+            np.where(ob >= 0, np.take_along_axis(h, safe, axis=1), np.nan))
+
+
+def walk_forward_signals(o, h, l, c, v, params):
+    p = {**DEFAULT_PARAMS, **params}
+    ind = compute_indicators(c, v)
+    bos = walk_forward_bos(h, c, p["window"])
+    ob_low, ob_high = walk_forward_ob(o, h, l, c, p["window"], p["ob_break"])
+    valid, entry, sl, tp = trading_setup(c, ob_low, ob_high, p["zone"], p["sl_buffer"], p["rr"])
+    score = skor(c, volume_ratio(v, ind["Avg_Vol_5"]), ind["MA50"], ind["RSI"], bos)
+    enough = np.cumsum(~np.isnan(c), axis=1) >= MIN_BARS
+    signal = enough & valid & (score >= p["min_score"])
+    return {"signal": signal, "score": score, "entry": entry, "sl": sl, "tp": tp}
+
+
+def first_true(mask):
+    # Kolom True pertama per baris, -1 bila tidak ada.
+    return np.where(mask.any(axis=1), np.argmax(mask, axis=1), -1)
+
+
+def simulate_ticker(o, h, l, c, sig, params):
+    # Satu ticker (array 1D). Semua sinyal disimulasikan serentak, lalu disaring agar hanya satu posisi
+    # terbuka per ticker (sinyal berikutnya diabaikan sampai posisi sebelumnya keluar).
+    p = {**DEFAULT_PARAMS, **params}
+    T = len(c)
+    st = np.nonzero(sig["signal"])[0]
+    st = st[st < T - 1]
+    if not len(st): return None
+    entry, sl, tp = sig["entry"][st], sig["sl"][st], sig["tp"][st]
+
+    wait = st[:, None] + 1 + np.arange(p["max_wait"])
+    inr = wait < T; wait = np.minimum(wait, T - 1)
+    k = first_true(inr & (l[wait] <= entry[:, None]))
+    filled = k >= 0
+    st, entry, sl, tp, k = st[filled], entry[filled], sl[filled], tp[filled], k[filled]
+    if not len(st): return None
+    f = st + 1 + k
+    fill = np.minimum(o[f], entry)
+
+    hold = f[:, None] + np.arange(p["max_hold"])
+    inr = hold < T; hold = np.minimum(hold, T - 1)
+    sl_hit = first_true(inr & (l[hold] <= sl[:, None]))
+    tp_mask = inr & (h[hold] >= tp[:, None]); tp_mask[:, 0] = False  # TP baru dihitung sejak bar setelah fill
+    tp_hit = first_true(tp_mask)
+    last_k = inr.sum(axis=1) - 1
+    is_sl = (sl_hit >= 0) & ((tp_hit < 0) | (sl_hit <= tp_hit))  # SL & TP di bar yang sama -> anggap SL
+    is_tp = ~is_sl & (tp_hit >= 0)
+    exit_k = np.where(is_sl, sl_hit, np.where(is_tp, tp_hit, last_k))
+    x = f + exit_k
+    exit_px = np.where(is_sl, np.minimum(o[x], sl), np.where(is_tp, np.maximum(o[x], tp), c[x]))
+
+    keep, busy_until = np.zeros(len(st), dtype=bool), -1
+    for i in range(len(st)):
+        if f[i] > busy_until: keep[i] = True; busy_until = x[i]
+
+    risk = entry - sl
+    return pd.DataFrame({
+        "signal_i": st[keep], "fill_i": f[keep], "exit_i": x[keep], "Skor": sig["score"][st[keep]],
+        "Entry": fill[keep], "SL": sl[keep], "TP": tp[keep], "Exit": exit_px[keep],
+        "Outcome": np.where(is_sl, "SL", np.where(is_tp, "TP", "Timeout"))[keep],
+        "R": ((exit_px - fill) / risk)[keep], "Return %": ((exit_px - fill) / fill * 100)[keep],
+    })
+
+
+def run_backtest(arrays, tickers, params=None, sectors=None):
+    params = params or {}
+    o, h, l, c, v = (arrays[f] for f in ["Open", "High", "Low", "Close", "Volume"])
+    sig = walk_forward_signals(o, h, l, c, v, params)
+    trades = []
+    for i, t in enumerate(tickers):
+        if not sig["signal"][i].any(): continue
+        tr = simulate_ticker(o[i], h[i], l[i], c[i], {k: a[i] for k, a in sig.items()}, params)
+        if tr is None or tr.empty: continue
+        dates = arrays["Date"][i]
+        tr.insert(0, "Ticker", t)
+        tr.insert(1, "Sektor", (sectors or {}).get(t, "Lainnya"))
+        for col in ["signal_i", "fill_i", "exit_i"]: tr[col.replace("_i", "_date")] = dates[tr.pop(col)]
+        trades.append(tr)
+    return pd.concat(trades, ignore_index=True) if trades else pd.DataFrame()
+
+
+def max_drawdown(r, exit_dates):
+    # Drawdown maksimum kurva ekuitas kumulatif (dalam R, risiko sama per trade), urut tanggal keluar.
+    if not len(r): return 0.0
+    eq = np.cumsum(np.asarray(r)[np.argsort(np.asarray(exit_dates), kind="stable")])
+    return float(np.max(np.maximum.accumulate(np.concatenate([[0.0], eq]))[1:] - eq))
+
+
+STAT_COLUMNS = ["Trades", "Hit Rate %", "Win Rate %", "Expectancy (R)", "Avg Return %", "Max DD (R)"]
+
+
+def summarize(trades, by=None):
+    def stats(g):
+        return pd.Series({
+            "Trades": len(g), "Hit Rate %": round((g["Outcome"] == "TP").mean() * 100, 1),
+            "Win Rate %": round((g["R"] > 0).mean() * 100, 1), "Expectancy (R)": round(g["R"].mean(), 3),
+            "Avg Return %": round(g["Return %"].mean(), 2), "Max DD (R)": round(max_drawdown(g["R"], g["exit_date"]), 2),
+        })
+    if trades.empty: return pd.DataFrame()
+    if by is None: return stats(trades).to_frame().T.astype({"Trades": int})
+    if by == "Skor Bucket":
+        trades = trades.assign(**{by: pd.cut(trades["Skor"], SCORE_BUCKETS, labels=SCORE_LABELS)})
+    return trades.groupby(by, observed=True)[list(trades.columns)].apply(stats).astype({"Trades": int})
+
+
+# --- SWEEP PARAMETER PARALEL ---
+_DATA = {}
+
+
+def _init_worker(arrays, tickers, sectors):
+    _DATA.update(arrays=arrays, tickers=tickers, sectors=sectors)
+
+
+def _run_combo(params):
+    trades = run_backtest(_DATA["arrays"], _DATA["tickers"], params, _DATA["sectors"])
+    row = summarize(trades)
+    row = row.iloc[0].to_dict() if not row.empty else {"Trades": 0}
+    return {**params, **row}
+
+
+def sweep(arrays, tickers, grid, sectors=None, workers=None):
+    # grid: {"min_score": [50, 60, 70], "ob_break": [1.01, 1.02]} -> satu baris ringkasan per kombinasi.
+    keys = list(grid)
+    combos = [dict(zip(keys, vals)) for vals in itertools.product(*(grid[k] for k in keys))]
+    with ProcessPoolExecutor(max_workers=workers or os.cpu_count(), initializer=_init_worker,
+                             initargs=(arrays, list(tickers), sectors or {})) as pool:
+        rows = list(pool.map(_run_combo, combos))
+    # Kombinasi tanpa trade hanya punya "Trades": 0; kolom statistik lain diisi NaN.
+    table = pd.DataFrame(rows).reindex(columns=keys + STAT_COLUMNS).astype({"Trades": int})
+    return table.sort_values("Expectancy (R)", ascending=False, na_position="last", ignore_index=True)
+
+
+def load_history(tickers, period="3y"):
+    # Riwayat panjang lewat provider biasa (cache SQLite / rekaman lokal sesuai env), lalu ditumpuk.
+    from data_provider import get_provider
+    from scan_engine import ScanEngine
+    panel = get_provider(ScanEngine(workers=4, rate=2)).get_history(list(tickers), period=period)
+    arrays, tickers, lengths = stack_panel(panel, tickers)
+    keep = lengths >= MIN_BARS
+    return {k: a[keep] for k, a in arrays.items()}, [t for t, k in zip(tickers, keep) if k]
+
+
+def parse_grid(items):
+    grid = {}
+    for item in items or []:
+        key, vals = item.split("=", 1)
+        grid[key] = [type(DEFAULT_PARAMS[key])(x) for x in vals.split(",")]
+    return grid
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Backtest Skor & setup SMC (walk-forward).")
+    ap.add_argument("--tickers", help="daftar ticker dipisah koma (tanpa .JK boleh)")
+    ap.add_argument("--tickers-file", help="file berisi ticker, dipisah koma/baris")
+    ap.add_argument("--period", default="3y")
+    ap.add_argument("--workers", type=int, default=None)
+    ap.add_argument("--grid", action="append", help="param=v1,v2,... (boleh diulang) untuk sweep paralel")
+    ap.add_argument("--trades-csv", help="simpan daftar trade ke CSV")
+    for k, v in DEFAULT_PARAMS.items(): ap.add_argument(f"--{k.replace('_', '-')}", type=type(v), default=v)
+    args = ap.parse_args(argv)
+
+    raw = args.tickers or (open(args.tickers_file, encoding="utf-8").read() if args.tickers_file else "")
+    t_list = [t.strip().upper() + (".JK" if "." not in t else "") for t in raw.replace("\n", ",").split(",") if t.strip()]
+    if not t_list: ap.error("isi --tickers atau --tickers-file")
+    params = {k: getattr(args, k) for k in DEFAULT_PARAMS}
+
+    from metadata_store import MetadataStore
+    meta = MetadataStore(os.environ.get("SCREENER_METADATA", os.path.join("cache", "metadata.json")))
+    arrays, tickers = load_history(t_list, args.period)
+    sectors = {t: meta.sector(t) for t in tickers}
+    print(f"{len(tickers)} ticker dengan riwayat cukup, {arrays['Close'].shape[1]} bar")
+
+    grid = parse_grid(args.grid)
+    if grid:
+        print(sweep(arrays, tickers, {**{k: [v] for k, v in params.items() if k not in grid}, **grid}, sectors, args.workers).to_string())
+        return
+    trades = run_backtest(arrays, tickers, params, sectors)
+    if trades.empty: print("Tidak ada trade."); return
+    print(summarize(trades).to_string(index=False)); print()
+    print(summarize(trades, "Skor Bucket").to_string()); print()
+    print(summarize(trades, "Sektor").to_string())
+    if args.trades_csv: trades.to_csv(args.trades_csv, index=False)
+
+
+if __name__ == "__main__":
+    main()
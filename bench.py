@@ -0,0 +1,168 @@
+# --- BENCHMARK PIPELINE SCAN (UNIVERSE SINTETIS, TANPA JARINGAN) ---
+# Universe OHLCV sintetis ber-seed yang meniru BEI (fraksi harga, lot 100, suspend, emiten baru, hari tanpa
+# transaksi) dipakai untuk mengukur: run_scan per tahap dengan provider di memori, get_signals per ticker
+# (persentil latensi) dan persiapan data dashboard. Tiap angka = median dari --repeat kali. Dengan
+# --baseline, metrik yang lebih lambat dari baseline * (1 + --tolerance) dilaporkan dan exit code 1.
+#   python bench.py --sizes 900,5000 --out bench_baseline.json
+#   python bench.py --sizes 900,5000 --baseline bench_baseline.json
+import argparse
+import json
+import platform
+import sys
+import time
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+from data_provider import DEFAULT_PERIOD, OHLCV_FIELDS, DataProvider, period_to_start
+from metadata_store import MetadataStore
+from profiling import ScanProfile
+from result_store import export_table, filter_table, with_metadata
+from scanner import find_order_blocks, get_signals, get_trading_setup, run_scan
+
+DAYS = 120
+SECTORS = ["Keuangan", "Energi", "Barang Baku", "Perindustrian", "Barang Konsumen Primer", "Barang Konsumen Non-Primer",
+           "Kesehatan", "Properti & Real Estat", "Teknologi", "Infrastruktur", "Transportasi & Logistik"]
+
+
+def ticker_codes(n):
+    # 0 -> AAAA.JK, 1 -> AAAB.JK, ... (kode 4 huruf unik seperti BEI)
+    return ["".join(chr(65 + (i // 26 ** k) % 26) for k in (3, 2, 1, 0)) + ".JK" for i in range(n)]
+
+
+def tick_round(price):
+    # Fraksi harga BEI: <200 -> 1, <500 -> 2, <2000 -> 5, <5000 -> 10, selebihnya 25.
+    tick = np.select([price < 200, price < 500, price < 2000, price < 5000], [1, 2, 5, 10], 25)
+    return np.maximum(np.round(price / tick) * tick, 1.0)
+
+
+def synthetic_universe(n, days=DAYS, seed=0, end="2026-06-30"):
+    # -> panel (tanggal x (Ticker, Field)) seperti keluaran DataProvider, deterministik untuk (n, days, seed).
+    rng = np.random.default_rng(seed)
+    dates = pd.bdate_range(end=end, periods=days, name="Date")
+    close = np.exp(rng.uniform(np.log(50), np.log(20000), n))[:, None] * np.exp(
+        np.cumsum(rng.normal(0.0003, 1, (n, days)) * rng.uniform(0.01, 0.04, n)[:, None], axis=1))
+    open_ = close * np.exp(rng.normal(0, 0.01, (n, days)))
+    high = np.maximum(open_, close) * (1 + np.abs(rng.normal(0, 0.01, (n, days))))
+    low = np.minimum(open_, close) * (1 - np.abs(rng.normal(0, 0.01, (n, days))))
+    volume = np.round(rng.lognormal(13, 1.5, n)[:, None] * rng.lognormal(0, 0.6, (n, days)), -2)
+    volume[rng.random((n, days)) < 0.02] = 0                       # hari tanpa transaksi
+    data = np.stack([tick_round(open_), tick_round(high), tick_round(low), tick_round(close), volume], axis=2)
+    for i in np.flatnonzero(rng.random(n) < 0.03):                 # suspend 5-15 hari bursa
+        s = rng.integers(0, days - 15); data[i, s:s + rng.integers(5, 16)] = np.nan
+    for i in np.flatnonzero(rng.random(n) < 0.03):                 # emiten baru, riwayat pendek
+        data[i, :days - rng.integers(10, 60)] = np.nan
+    cols = pd.MultiIndex.from_product([ticker_codes(n), OHLCV_FIELDS], names=["Ticker", "Field"])
+    return pd.DataFrame(data.transpose(1, 0, 2).reshape(days, n * len(OHLCV_FIELDS)), index=dates, columns=cols)
+
+
+def synthetic_metadata(tickers, seed=0):
+    # MetadataStore di memori yang sudah lengkap, jadi run_scan tidak menjadwalkan refresh ticker.info.
+    rng = np.random.default_rng(seed)
+    meta = MetadataStore()
+    for t, s in zip(tickers, rng.integers(0, len(SECTORS), len(tickers))): meta.put(t, f"PT {t[:4]} Tbk", SECTORS[s])
+    return meta
+
+
+class MemoryProvider(DataProvider):
+    def __init__(self, panel):
+        self.panel = panel
+
+    def get_history(self, tickers, period=DEFAULT_PERIOD, start=None):
+        start = pd.Timestamp(start if start is not None else period_to_start(period, self.panel.index[-1].to_pydatetime()))
+        panel = self.panel[self.panel.index >= start]
+        return panel.loc[:, panel.columns.get_level_values(0).isin(list(tickers))]
+
+
+def median_stages(profiles):
+    names = list(dict.fromkeys(k for p in profiles for k in p.stages))
+    out = {k: round(float(np.median([p.stages.get(k, 0.0) for p in profiles])) * 1000, 3) for k in names}
+    out["total"] = round(float(np.median([sum(p.stages.values()) for p in profiles])) * 1000, 3)
+    return out
+
+
+def bench_size(n, seed=0, repeat=3, sample=200):
+    panel = synthetic_universe(n, seed=seed)
+    tickers = list(panel.columns.get_level_values(0).unique())
+    meta, provider = synthetic_metadata(tickers, seed), MemoryProvider(panel)
+
+    # 1. Pipeline batch (sama dengan tombol scan dan scan_cli.py), per tahap.
+    scans = [run_scan(tickers, meta, provider=provider) for _ in range(repeat)]
+    table, history = scans[-1][0], scans[-1][1]
+
+    # 2. Jalur per ticker get_signals (indikator pandas + find_order_blocks + detect_market_structure).
+    get_signals(tickers[0], panel, meta)  # pemanasan (impor/cache pandas) sebelum diukur
+    per_ticker = ScanProfile()
+    for t in tickers[:sample]:
+        t0 = time.perf_counter(); get_signals(t, panel, meta); per_ticker.record([t], time.perf_counter() - t0)
+
+    # 3. Persiapan data dashboard: join metadata, filter + urut, ekspor CSV, data chart baris teratas.
+    uis = []
+    for _ in range(repeat):
+        ui = ScanProfile()
+        with ui.stage("dashboard_data"):
+            df_full = with_metadata(table, meta)
+            filtered = filter_table(df_full, df_full["Sektor"].unique(), 0)
+        with ui.stage("csv"): export_table(filtered.drop(columns=["Nama"])).to_csv(index=False)
+        with ui.stage("chart_data"):
+            top = filtered.iloc[0]
+            get_trading_setup(top["Harga"], find_order_blocks(history.frame(top["Ticker"])))
+        uis.append(ui)
+
+    return {
+        "tickers": n, "results": len(table), "failures": len(scans[-1][2]),
+        "scan_ms": median_stages([s[4] for s in scans]),
+        "get_signals_ms": {**{k: round(v * 1000, 3) for k, v in per_ticker.percentiles().items()},
+                           "sample": len(per_ticker.latencies), "total": round(sum(per_ticker.latencies.values()) * 1000, 3)},
+        "dashboard_ms": median_stages(uis),
+        "memory_mb": round((table.memory_usage(deep=True).sum() + history.nbytes) / 1e6, 2),
+    }
+
+
+def flatten(report):
+    # {"900": {"scan_ms": {"fetch": 1.2}}} -> {"900.scan_ms.fetch": 1.2}; hanya metrik waktu (ms).
+    return {f"{size}.{group}.{k}": v for size, r in report["sizes"].items() for group, vals in r.items()
+            if group.endswith("_ms") for k, v in vals.items() if k != "sample"}
+
+
+def regressions(report, baseline, tolerance=0.25, min_ms=2.0):
+    # Metrik yang melambat > tolerance (relatif) dan > min_ms (absolut, supaya noise tahap kecil diabaikan).
+    cur, base = flatten(report), flatten(baseline)
+    return [(k, base[k], cur[k]) for k in cur if k in base and cur[k] > base[k] * (1 + tolerance) and cur[k] - base[k] > min_ms]
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Benchmark scan dengan universe OHLCV sintetis (tanpa jaringan).")
+    ap.add_argument("--sizes", default="900,5000", help="jumlah ticker dipisah koma (default 900,5000)")
+    ap.add_argument("--seed", type=int, default=0)
+    ap.add_argument("--repeat", type=int, default=3, help="ulangan per pengukuran, dilaporkan median")
+    ap.add_argument("--sample", type=int, default=200, help="jumlah ticker untuk jalur per ticker get_signals")
+    ap.add_argument("--out", help="tulis laporan JSON ke file ini (bisa dipakai sebagai baseline)")
+    ap.add_argument("--baseline", help="laporan JSON sebelumnya; exit code 1 bila ada regresi")
+    ap.add_argument("--tolerance", type=float, default=0.25, help="perlambatan relatif yang masih diterima")
+    args = ap.parse_args(argv)
+
+    report = {
+        "created": datetime.now().isoformat(timespec="seconds"), "seed": args.seed, "days": DAYS, "repeat": args.repeat,
+        "python": platform.python_version(), "numpy": np.__version__, "pandas": pd.__version__, "sizes": {},
+    }
+    for n in (int(s) for s in args.sizes.split(",") if s.strip()):
+        r = report["sizes"][str(n)] = bench_size(n, args.seed, args.repeat, args.sample)
+        sig = r["get_signals_ms"]
+        print(f"{n} ticker: scan {r['scan_ms']['total']:.0f} ms ({', '.join(f'{k} {v:.0f}' for k, v in r['scan_ms'].items() if k != 'total')}), "
+              f"get_signals p50 {sig.get('p50', 0):.1f} / p99 {sig.get('p99', 0):.1f} ms, dashboard {r['dashboard_ms']['total']:.0f} ms, "
+              f"{r['memory_mb']} MB")
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f: json.dump(report, f, indent=1)
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f: baseline = json.load(f)
+        slow = regressions(report, baseline, args.tolerance)
+        for k, before, after in slow: print(f"REGRESI {k}: {before:.1f} -> {after:.1f} ms ({after / before - 1:+.0%})")
+        if slow: return 1
+        print(f"Tidak ada regresi terhadap {args.baseline} (toleransi {args.tolerance:.0%}).")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,194 @@
+# --- LAPISAN PENYEDIA DATA OHLCV ---
+# Semua provider mengembalikan satu "panel": DataFrame dengan kolom MultiIndex (Ticker, Field),
+# sama seperti keluaran yf.download(..., group_by="ticker"). Kode sinyal membaca per ticker via panel_ticker().
+import logging
+import os
+from datetime import datetime, timedelta
+
+import pandas as pd
+
+from scan_engine import ScanFailure
+
+OHLCV_FIELDS = ["Open", "High", "Low", "Close", "Volume"]
+DEFAULT_PERIOD = "120d"
+
+
+PERIOD_DAYS = {"d": 1, "mo": 30, "y": 365}
+
+
+def period_to_start(period, now=None):
+    # "120d" / "6mo" / "5y" -> tanggal mulai kalender (perkiraan perilaku period milik yfinance)
+    now = now or datetime.now()
+    unit = next((u for u in PERIOD_DAYS if period.endswith(u) and period[:-len(u)].isdigit()), None)
+    if unit is None: raise ValueError(f"Period tidak didukung: {period}")
+    return (now - timedelta(days=int(period[:-len(unit)]) * PERIOD_DAYS[unit])).date()
+
+
+def empty_panel():
+    return pd.DataFrame(columns=pd.MultiIndex.from_arrays([[], []], names=["Ticker", "Field"]))
+
+
+def make_panel(frames):
+    # frames: {ticker: DataFrame OHLCV} -> panel MultiIndex (Ticker, Field)
+    frames = {t: df[OHLCV_FIELDS] for t, df in frames.items() if df is not None and not df.empty}
+    if not frames: return empty_panel()
+    panel = pd.concat(frames, axis=1, sort=True)
+    panel.columns.names = ["Ticker", "Field"]
+    return panel
+
+
+def panel_tickers(panel):
+    return list(panel.columns.get_level_values(0).unique()) if not panel.empty else []
+
+
+def panel_ticker(panel, t):
+    # Potong satu ticker dari panel; baris libur/suspend (semua NaN) dibuang.
+    if panel.empty or t not in panel.columns.get_level_values(0): return pd.DataFrame(columns=OHLCV_FIELDS)
+    return panel[t].dropna(how="all").copy()
+
+
+class DataProvider:
+    # Antarmuka: get_history(tickers, period, start) -> panel.
+    # Jika start diberikan, start menggantikan period (dipakai untuk pengambilan inkremental).
+    # fetch() = get_history + (list ScanFailure per ticker, progres on_progress(ticker selesai, total, item)).
+    # offline = True untuk sumber tanpa jaringan; run_scan lalu tidak me-refresh metadata lewat yfinance.
+    offline = False
+
+    def get_history(self, tickers, period=DEFAULT_PERIOD, start=None):
+        raise NotImplementedError
+
+    def fetch(self, tickers, period=DEFAULT_PERIOD, start=None, on_progress=None):
+        tickers = list(tickers)
+        panel = self.get_history(tickers, period=period, start=start)
+        if on_progress: on_progress(len(tickers), len(tickers), None)
+        return panel, []
+
+
+class DownloadError(Exception):
+    pass
+
+
+class YFErrorLog(logging.Handler):
+    # yf.download menangkap error tiap simbol sendiri (ticker gagal = frame kosong) dan hanya mencatatnya ke
+    # logger "yfinance" sebagai "['KODE.JK', ...]: pesan". Handler ini menyimpan pesan itu per ticker.
+    def __init__(self, tickers):
+        super().__init__(logging.ERROR)
+        self.wanted = {t.upper() for t in tickers}
+        self.errors = {}
+
+    def emit(self, record):
+        head, sep, err = record.getMessage().partition("]: ")
+        if not sep or not head.startswith("["): return
+        for t in head[1:].replace("'", "").split(","):
+            if t.strip() in self.wanted: self.errors.setdefault(t.strip(), err.strip())
+
+
+class YahooProvider(DataProvider):
+    # engine (scan_engine.ScanEngine) opsional: tiap ticker satu item (yf.download tetap mengirim satu request
+    # Ticker.history per simbol), jadi rate limit, retry dan backoff engine berlaku per request ke Yahoo.
+    # Tanpa engine: chunk chunk_size ticker diunduh dengan thread milik yfinance.
+    def __init__(self, chunk_size=100, engine=None):
+        self.chunk_size = chunk_size
+        self.engine = engine
+
+    def chunks(self, tickers):
+        size = 1 if self.engine is not None else self.chunk_size
+        return [tickers[i:i + size] for i in range(0, len(tickers), size)]
+
+    def download_chunk(self, tickers, period=DEFAULT_PERIOD, start=None):
+        # -> (panel, {ticker: pesan error}) untuk ticker yang tidak kembali atau seluruhnya NaN.
+        import yfinance as yf
+        kwargs = {"start": str(start)} if start is not None else {"period": period}
+        log, logger = YFErrorLog(tickers), logging.getLogger("yfinance")
+        logger.addHandler(log)
+        try:
+            raw = yf.download(tickers, group_by="ticker", auto_adjust=True, threads=self.engine is None, progress=False, **kwargs)
+        finally:
+            logger.removeHandler(log)
+        frames = {}
+        if raw is not None and not raw.empty:
+            if not isinstance(raw.columns, pd.MultiIndex):
+                raw.columns = pd.MultiIndex.from_product([[tickers[0]], raw.columns])
+            frames = {t: raw[t].dropna(how="all") for t in raw.columns.get_level_values(0).unique()}
+        frames = {t: df for t, df in frames.items() if not df.empty}
+        missing = {t: log.errors.get(t.upper(), "Tidak ada data dari Yahoo") for t in tickers if t not in frames}
+        return make_panel(frames), missing
+
+    def download_one(self, t, period=DEFAULT_PERIOD, start=None):
+        # Untuk ScanEngine: ticker kosong = exception, supaya di-retry dengan backoff lalu dilaporkan.
+        panel, missing = self.download_chunk([t], period, start)
+        if missing: raise DownloadError(missing[t])
+        return panel
+
+    def get_history(self, tickers, period=DEFAULT_PERIOD, start=None):
+        return self.fetch(tickers, period, start)[0]
+
+    def fetch(self, tickers, period=DEFAULT_PERIOD, start=None, on_progress=None):
+        # Ticker yang gagal (setelah retry bila ada engine) dilaporkan per ticker dengan pesan error aslinya.
+        tickers = list(tickers)
+        chunks = [tuple(c) for c in self.chunks(tickers)]
+        state = {"done": 0}
+        def progress(_, __, chunk):
+            state["done"] += len(chunk)
+            if on_progress: on_progress(state["done"], len(tickers), chunk)
+        if self.engine is not None:
+            by_name = {str(c): c for c in chunks}
+            done, failed = self.engine.map(lambda c: self.download_one(c[0], period, start), chunks, progress)
+            parts = [done[c] for c in chunks if c in done]
+            failures = [ScanFailure(t, f.error, f.attempts) for f in failed for t in by_name[f.ticker]]
+        else:
+            parts, failures = [], []
+            for c in chunks:
+                try:
+                    panel, missing = self.download_chunk(list(c), period, start)
+                    parts.append(panel); failures += [ScanFailure(t, f"DownloadError: {err}", 1) for t, err in missing.items()]
+                except Exception as e: failures += [ScanFailure(t, f"{type(e).__name__}: {e}", 1) for t in c]
+                progress(None, None, c)
+        parts = [p for p in parts if not p.empty]
+        return (pd.concat(parts, axis=1, sort=True) if parts else empty_panel()), failures
+
+
+class LocalFileProvider(DataProvider):
+    # Data rekaman: satu CSV per ticker (<root>/<TICKER>.csv, index Date, kolom OHLCV).
+    offline = True
+
+    def __init__(self, root):
+        self.root = root
+
+    def path(self, t):
+        return os.path.join(self.root, f"{t}.csv")
+
+    def read(self, t):
+        p = self.path(t)
+        if not os.path.exists(p): return None
+        return pd.read_csv(p, index_col=0, parse_dates=True)
+
+    def get_history(self, tickers, period=DEFAULT_PERIOD, start=None):
+        frames = {}
+        for t in tickers:
+            df = self.read(t)
+            if df is None or df.empty: continue
+            # Rekaman dipotong relatif terhadap bar terakhirnya sendiri, supaya hasil offline stabil.
+            idx = df.index.tz_localize(None) if df.index.tz is not None else df.index
+            start_t = pd.Timestamp(start if start is not None else period_to_start(period, idx[-1].to_pydatetime()))
+            frames[t] = df[idx >= start_t]
+        return make_panel(frames)
+
+    def record(self, panel):
+        # Simpan panel (mis. hasil YahooProvider) sebagai rekaman offline.
+        os.makedirs(self.root, exist_ok=True)
+        for t in panel_tickers(panel):
+            panel_ticker(panel, t).to_csv(self.path(t))
+
+
+def get_provider(engine=None, intraday_ttl=900):
+    # SCREENER_DATA_DIR=<folder rekaman> -> pemindaian offline tanpa jaringan.
+    # SCREENER_CACHE=<file sqlite> (kosongkan untuk menonaktifkan) -> cache OHLCV inkremental;
+    # intraday_ttl = umur maksimum bar intraday di cache selama sesi bursa (mode live memakai lebih pendek).
+    data_dir = os.environ.get("SCREENER_DATA_DIR")
+    if data_dir: return LocalFileProvider(data_dir)
+    provider = YahooProvider(engine=engine)
+    cache_path = os.environ.get("SCREENER_CACHE", os.path.join("cache", "ohlcv.sqlite"))
+    if not cache_path: return provider
+    from ohlcv_cache import CachedProvider, OHLCVStore
+    return CachedProvider(provider, OHLCVStore(cache_path), intraday_ttl)
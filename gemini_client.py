@@ -0,0 +1,84 @@
+# --- KLIEN GEMINI (SESSION POOL, PARALEL, CACHE) ---
+# Satu instance per proses (app.py: st.cache_resource). Semua request memakai satu requests.Session
+# dengan pool koneksi, dibatasi token bucket bersama yang juga dijeda saat server membalas 429, dan
+# jawaban disimpan per hash (prompt, system instruction) sehingga analisis ulang atas scan yang sama
+# langsung dijawab dari memori.
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from scan_engine import ScanEngine, TokenBucket
+
+# --- KONFIGURASI GEMINI ---
+# GEMINI_URL bisa diarahkan ke server stub lokal untuk pengujian tanpa jaringan.
+GEMINI_URL = os.environ.get("GEMINI_URL", "https://generativelanguage.googleapis.com/v1beta/models/gemini-2.5-flash-preview-09-2025:generateContent")
+GEMINI_WORKERS = int(os.environ.get("GEMINI_WORKERS", 4))   # batch yang dikirim bersamaan
+GEMINI_RATE = float(os.environ.get("GEMINI_RATE", 2))        # request/detik
+GEMINI_RETRIES = int(os.environ.get("GEMINI_RETRIES", 5))
+GEMINI_CACHE_SIZE = int(os.environ.get("GEMINI_CACHE_SIZE", 256))
+
+
+class RateLimited(Exception):
+    pass
+
+
+def cache_key(prompt, system_instruction):
+    return hashlib.sha256(f"{system_instruction}\0{prompt}".encode("utf-8")).hexdigest()
+
+
+class GeminiClient:
+    def __init__(self, api_key="", url=GEMINI_URL, workers=GEMINI_WORKERS, rate=GEMINI_RATE,
+                 retries=GEMINI_RETRIES, cache_size=GEMINI_CACHE_SIZE, timeout=45):
+        self.api_key, self.url, self.timeout = api_key, url, timeout
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=max(1, workers))
+        self.session.mount("http://", adapter); self.session.mount("https://", adapter)
+        self.limiter = TokenBucket(rate)
+        self.engine = ScanEngine(workers=workers, retries=retries, backoff=1.0, limiter=self.limiter)
+        self.cache_size = cache_size
+        self.cache = OrderedDict()  # cache_key -> teks jawaban (LRU)
+        self.lock = threading.Lock()
+
+    def cached(self, prompt, system_instruction):
+        key = cache_key(prompt, system_instruction)
+        with self.lock:
+            if key not in self.cache: return None
+            self.cache.move_to_end(key)
+            return self.cache[key]
+
+    def store(self, prompt, system_instruction, text):
+        with self.lock:
+            self.cache[cache_key(prompt, system_instruction)] = text
+            while len(self.cache) > self.cache_size: self.cache.popitem(last=False)
+
+    def post(self, prompt, system_instruction):
+        # Satu request; exception diteruskan supaya ScanEngine yang me-retry dengan backoff.
+        payload = {"contents": [{"parts": [{"text": prompt}]}], "systemInstruction": {"parts": [{"text": system_instruction}]}}
+        response = self.session.post(self.url, params={"key": self.api_key}, json=payload, timeout=self.timeout)
+        if response.status_code == 429:
+            retry_after = response.headers.get("Retry-After", "")
+            self.limiter.pause(float(retry_after) if retry_after.isdigit() else 5.0)
+            raise RateLimited("HTTP 429")
+        response.raise_for_status()
+        text = response.json().get('candidates', [{}])[0].get('content', {}).get('parts', [{}])[0].get('text', "")
+        if not text: raise ValueError("Respons Gemini kosong")
+        self.store(prompt, system_instruction, text)
+        return text
+
+    def generate(self, prompt, system_instruction):
+        # -> teks jawaban, "" bila semua percobaan gagal (perilaku call_gemini_ai lama).
+        texts, _ = self.generate_many([(prompt, system_instruction)])
+        return texts[0]
+
+    def generate_many(self, jobs, on_progress=None):
+        # jobs: [(prompt, system_instruction)] -> (teks sesuai urutan jobs, list ScanFailure). Job yang sudah
+        # ada di cache tidak dikirim; sisanya dikirim paralel sebanyak `workers`. on_progress(selesai, total, job).
+        jobs = [tuple(j) for j in jobs]
+        texts = {j: self.cached(*j) for j in dict.fromkeys(jobs)}
+        results, failures = self.engine.map(lambda j: self.post(*j), [j for j, t in texts.items() if t is None], on_progress)
+        texts.update(results)
+        return [texts[j] or "" for j in jobs], failures
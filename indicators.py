@@ -0,0 +1,104 @@
+# --- MESIN INDIKATOR VEKTOR (TICKER x TANGGAL) ---
+# Semua array berbentuk (n_ticker, n_bar), rata kanan: bar terakhir tiap ticker ada di kolom -1 dan
+# bagian kiri yang kosong diisi NaN. Perhitungan meniru rumus per-ticker di app.py (rolling mean pandas,
+# calculate_rsi, Avg_Vol_5, Skor) sehingga hasilnya sama untuk satu ticker maupun seluruh universe.
+import numpy as np
+import pandas as pd
+
+from data_provider import OHLCV_FIELDS
+
+MIN_BARS = 50
+
+
+def stack_panel(panel, tickers=None):
+    # Panel (tanggal x (Ticker, Field)) -> ({field: array (n, L)}, tickers, lengths). Baris yang seluruhnya
+    # NaN (libur/suspend) dibuang per ticker, sama seperti panel_ticker(). arrays["Date"] berisi tanggal bar.
+    tickers = list(panel.columns.get_level_values(0).unique()) if tickers is None else list(tickers)
+    n = len(tickers)
+    if panel.empty or n == 0:
+        arrays = {f: np.empty((n, 0)) for f in OHLCV_FIELDS}
+        arrays["Date"] = np.empty((n, 0), dtype="datetime64[ns]")
+        return arrays, tickers, np.zeros(n, dtype=int)
+    cols = pd.MultiIndex.from_product([tickers, OHLCV_FIELDS])
+    raw = panel.reindex(columns=cols).to_numpy(dtype=float).reshape(len(panel), n, len(OHLCV_FIELDS)).transpose(1, 0, 2)
+    valid = ~np.isnan(raw).all(axis=2)                       # (n, D)
+    lengths = valid.sum(axis=1)
+    L = int(lengths.max()) if n else 0
+    # posisi tujuan rata kanan: L - (jumlah bar valid dari posisi ini sampai akhir)
+    dest = L - np.cumsum(valid[:, ::-1], axis=1)[:, ::-1]
+    rows, src = np.nonzero(valid)
+    out = np.full((n, L, len(OHLCV_FIELDS)), np.nan)
+    out[rows, dest[rows, src]] = raw[rows, src]
+    dates = np.full((n, L), np.datetime64("NaT"), dtype="datetime64[ns]")
+    dates[rows, dest[rows, src]] = panel.index.to_numpy(dtype="datetime64[ns]")[src]
+    arrays = {f: out[:, :, k] for k, f in enumerate(OHLCV_FIELDS)}
+    arrays["Date"] = dates
+    return arrays, tickers, lengths
+
+
+def rolling_mean(x, window):
+    # Setara Series.rolling(window).mean(): NaN sampai jendela penuh; jendela konstan mengembalikan
+    # nilai itu persis (pandas juga begitu), selain itu dijumlah berurutan seperti jendela pertama pandas.
+    n, L = x.shape
+    out = np.full((n, L), np.nan)
+    if L < window: return out
+    m = L - window + 1
+    total = x[:, :m].copy()
+    same = np.ones((n, m), dtype=bool)
+    for k in range(1, window):
+        total += x[:, k:k + m]
+        same &= x[:, k:k + m] == x[:, :m]
+    out[:, window - 1:] = np.where(same, x[:, :m], total / window)
+    return out
+
+
+def rsi(close, window=14):
+    # calculate_rsi() versi array: delta NaN pertama dihitung 0 untuk gain/loss, RSI tanpa nilai -> 50.
+    own = ~np.isnan(close)
+    delta = np.full(close.shape, np.nan)
+    delta[:, 1:] = close[:, 1:] - close[:, :-1]
+    gain = np.where(own, np.where(delta > 0, delta, 0.0), np.nan)
+    loss = np.where(own, np.where(delta < 0, -delta, 0.0), np.nan)
+    avg_gain, avg_loss = rolling_mean(gain, window), rolling_mean(loss, window)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        rs = avg_gain / np.where(avg_loss == 0, np.nan, avg_loss)
+        out = 100 - (100 / (1 + rs))
+    return np.where(own & np.isnan(out), 50.0, out)
+
+
+def compute_indicators(close, volume):
+    prev_vol = np.full(volume.shape, np.nan)
+    prev_vol[:, 1:] = volume[:, :-1]
+    return {"MA20": rolling_mean(close, 20), "MA50": rolling_mean(close, 50),
+            "RSI": rsi(close), "Avg_Vol_5": rolling_mean(prev_vol, 5)}
+
+
+def volume_ratio(volume, avg_vol):
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.where(avg_vol > 0, volume / avg_vol, 0.0)
+
+
+def skor(price, v_ratio, ma50, r, bos):
+    # Skor 0-100 (volume 40, MA50 30, RSI 20, BOS 10); berlaku untuk array bentuk apa pun.
+    v_score = np.where(v_ratio > 2.0, 40, np.where(v_ratio > 1.5, 20, 5))
+    ma_score = np.where(price > ma50, 30, 0)
+    rsi_score = np.where(r < 35, 20, np.where(r < 65, 10, 0))
+    return (v_score + ma_score + rsi_score + np.where(bos, 10, 0)).astype(np.int64)
+
+
+def score_table(tickers, close, volume, ind=None, structure=None, jarak_entry=None):
+    # Baris terakhir tiap ticker -> tabel hasil (kolom sama dengan get_signals, tanpa Nama/Sektor/df).
+    ind = ind if ind is not None else compute_indicators(close, volume)
+    n = len(tickers)
+    price, prev = close[:, -1], close[:, -2]
+    ma20, ma50, r, avg_vol = ind["MA20"][:, -1], ind["MA50"][:, -1], ind["RSI"][:, -1], ind["Avg_Vol_5"][:, -1]
+    v_ratio = volume_ratio(volume[:, -1], avg_vol)
+    with np.errstate(divide="ignore", invalid="ignore"): chg = (price - prev) / prev * 100
+    structure = np.asarray(structure if structure is not None else ["Sideways/Retracement"] * n, dtype=object)
+    return pd.DataFrame({
+        "Ticker": list(tickers), "Harga": np.rint(price).astype(np.int64), "Chg %": np.round(chg, 2),
+        "Skor": skor(price, v_ratio, ma50, r, structure == "BOS Bullish"),
+        "Jarak Entry (%)": list(jarak_entry) if jarak_entry is not None else [None] * n,
+        "Vol Ratio": np.round(v_ratio, 2), "RSI": np.round(r, 1), "Structure": structure,
+        "MA20": np.where(price > ma20, "Bullish ✅", "Bearish ❌"), "MA50": np.where(price > ma50, "Atas ⬆️", "Bawah ⬇️"),
+    })
@@ -0,0 +1,109 @@
+# --- CACHE METADATA TICKER (NAMA & SEKTOR) ---
+# ticker.info adalah panggilan yfinance paling lambat, padahal nama/sektor hampir tidak pernah berubah.
+# Store ini diisi sekali (daftar emiten BEI dari CSV/JSON atau info yfinance), disimpan ke disk, dan
+# di-refresh di background dengan TTL panjang sehingga pemindaian tidak pernah menunggu info.
+import csv
+import json
+import os
+import threading
+import time
+
+NAME_KEYS = ("longName", "name", "nama", "Nama", "Nama Perusahaan")
+SECTOR_KEYS = ("sector", "sektor", "Sektor")
+TICKER_KEYS = ("ticker", "Ticker", "kode", "Kode", "Kode Saham", "symbol")
+DEFAULT_SECTOR = "Lainnya"
+
+
+def normalize_ticker(t):
+    t = str(t).strip().upper()
+    return t if "." in t else t + ".JK"
+
+
+def pick(row, keys):
+    for k in keys:
+        if row.get(k): return str(row[k]).strip()
+    return None
+
+
+class MetadataStore:
+    def __init__(self, path=None, ttl=30 * 24 * 3600, retry_ttl=6 * 3600):
+        self.path = path
+        self.ttl = ttl
+        self.retry_ttl = retry_ttl  # lookup yang gagal dicoba lagi setelah ini, bukan di setiap scan
+        self.lock = threading.Lock()
+        self.data = {}  # ticker -> {"name", "sector", "updated"[, "failed"]}
+        self.refreshing = None
+        if path and os.path.exists(path):
+            with open(path, encoding="utf-8") as f: self.data = json.load(f)
+
+    def save(self):
+        if not self.path: return
+        if os.path.dirname(self.path): os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        with self.lock: snapshot = dict(self.data)
+        tmp = self.path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f: json.dump(snapshot, f)
+        os.replace(tmp, self.path)
+
+    def put(self, t, name=None, sector=None, updated=None):
+        with self.lock:
+            old = self.data.get(t, {})
+            self.data[t] = {"name": name or old.get("name"), "sector": sector or old.get("sector"), "updated": updated or time.time()}
+
+    def load_listings(self, path):
+        # CSV (kolom ticker/kode, nama, sektor) atau JSON (list of dict / dict ticker -> dict).
+        with open(path, encoding="utf-8") as f:
+            if path.lower().endswith(".json"):
+                raw = json.load(f)
+                rows = [dict(v, ticker=k) for k, v in raw.items()] if isinstance(raw, dict) else raw
+            else:
+                rows = list(csv.DictReader(f))
+        n = 0
+        for row in rows:
+            t = pick(row, TICKER_KEYS)
+            if not t: continue
+            self.put(normalize_ticker(t), pick(row, NAME_KEYS), pick(row, SECTOR_KEYS)); n += 1
+        self.save()
+        return n
+
+    def name(self, t):
+        return (self.data.get(t) or {}).get("name") or t
+
+    def sector(self, t):
+        return (self.data.get(t) or {}).get("sector") or DEFAULT_SECTOR
+
+    def mark_failed(self, tickers, updated=None):
+        # Nama/sektor lama (bila ada) tetap dipakai; ticker dicoba lagi setelah retry_ttl.
+        with self.lock:
+            for t in tickers: self.data[t] = {**self.data.get(t, {}), "updated": updated or time.time(), "failed": True}
+
+    def stale(self, tickers, now=None):
+        now = now or time.time()
+        def expired(d): return now - d.get("updated", 0) > (self.retry_ttl if d.get("failed") else self.ttl)
+        return [t for t in tickers if t not in self.data or expired(self.data[t])]
+
+    def fetch(self, t):
+        import yfinance as yf
+        info = yf.Ticker(t).info or {}
+        self.put(t, info.get("longName"), info.get("sector"))
+        return True
+
+    def refresh(self, tickers, engine=None):
+        if engine is not None:
+            _, failures = engine.map(self.fetch, tickers)
+            self.mark_failed([f.ticker for f in failures])
+        else:
+            failures = []
+            for t in tickers:
+                try: self.fetch(t)
+                except Exception as e: failures.append((t, str(e)))
+            self.mark_failed([t for t, _ in failures])
+        self.save()
+        return failures
+
+    def refresh_async(self, tickers, engine=None):
+        # Satu refresh background sekaligus; pemanggil tidak menunggu.
+        tickers = list(tickers)
+        if not tickers or (self.refreshing and self.refreshing.is_alive()): return None
+        self.refreshing = threading.Thread(target=self.refresh, args=(tickers, engine), daemon=True)
+        self.refreshing.start()
+        return self.refreshing
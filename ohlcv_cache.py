@@ -0,0 +1,197 @@
+# --- CACHE OHLCV LOKAL (SQLite) ---
+# Bar harian disimpan per (ticker, tanggal). CachedProvider hanya mengambil bar setelah tanggal
+# terakhir di cache; bar terakhir ikut diambil ulang karena bisa saja masih bar intraday yang belum final.
+# Satu bar final sebelumnya juga diambil ulang sebagai pembanding: harga auto_adjust berubah mundur setelah
+# split/dividen, jadi bila Close-nya bergeser, seluruh rentang ticker itu diunduh ulang.
+import os
+import sqlite3
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+
+import pandas as pd
+
+from data_provider import DEFAULT_PERIOD, OHLCV_FIELDS, DataProvider, make_panel, panel_ticker, panel_tickers, period_to_start
+from scan_engine import ScanFailure
+
+WIB = timezone(timedelta(hours=7))
+IDX_OPEN = (9, 0)
+IDX_CLOSE = (16, 15)  # 16:00 penutupan + jeda sampai bar harian final di sumber data
+ADJUST_TOLERANCE = 0.002  # selisih relatif Close bar pembanding yang dianggap penyesuaian split/dividen
+
+
+def last_session(now):
+    # Tanggal sesi BEI terakhir yang sudah dibuka per `now` (WIB). Libur bursa tidak dikenali;
+    # cukup karena fetch ulang di hari libur hanya mengembalikan bar lama.
+    now = now.astimezone(WIB)
+    d = now.date()
+    if now.weekday() < 5 and (now.hour, now.minute) >= IDX_OPEN: return d
+    d -= timedelta(days=1)
+    while d.weekday() >= 5: d -= timedelta(days=1)
+    return d
+
+
+def is_stale(fetched_at, now, intraday_ttl=900):
+    # Selama sesi berjalan: basi setelah intraday_ttl detik. Di luar sesi: basi bila belum
+    # pernah diambil sejak penutupan sesi terakhir.
+    if fetched_at is None: return True
+    now = now.astimezone(WIB)
+    session = last_session(now)
+    close_dt = datetime(session.year, session.month, session.day, *IDX_CLOSE, tzinfo=WIB)
+    if now < close_dt: return now.timestamp() - fetched_at > intraday_ttl
+    return fetched_at < close_dt.timestamp()
+
+
+class OHLCVStore:
+    def __init__(self, path, max_rows=2_000_000):
+        self.path = path
+        self.max_rows = max_rows
+        self.lock = threading.Lock()
+        if os.path.dirname(path): os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.conn = sqlite3.connect(path, check_same_thread=False, timeout=30)
+        with self.lock, self.conn:
+            self.conn.execute("PRAGMA journal_mode=WAL")
+            self.conn.execute("""CREATE TABLE IF NOT EXISTS bars (
+                ticker TEXT, date TEXT, open REAL, high REAL, low REAL, close REAL, volume REAL,
+                PRIMARY KEY (ticker, date)) WITHOUT ROWID""")
+            self.conn.execute("""CREATE TABLE IF NOT EXISTS meta (
+                ticker TEXT PRIMARY KEY, covered_from TEXT, fetched_at REAL, accessed_at REAL)""")
+
+    def meta(self, tickers):
+        # {ticker: (covered_from, last_date, fetched_at)} untuk ticker yang ada di cache
+        out = {}
+        with self.lock:
+            for i in range(0, len(tickers), 500):
+                part = list(tickers[i:i + 500]); qs = ",".join("?" * len(part))
+                rows = self.conn.execute(f"""SELECT m.ticker, m.covered_from, MAX(b.date), m.fetched_at FROM meta m
+                    LEFT JOIN bars b ON b.ticker = m.ticker WHERE m.ticker IN ({qs}) GROUP BY m.ticker""", part)
+                out.update({t: (cf, last, fa) for t, cf, last, fa in rows})
+        return out
+
+    def anchors(self, tickers):
+        # {ticker: (tanggal, close)} bar kedua dari belakang; selalu final karena ada bar sesudahnya.
+        out = {}
+        with self.lock:
+            for i in range(0, len(tickers), 500):
+                part = list(tickers[i:i + 500]); qs = ",".join("?" * len(part))
+                rows = self.conn.execute(f"""SELECT ticker, date, close FROM (SELECT ticker, date, close,
+                    ROW_NUMBER() OVER (PARTITION BY ticker ORDER BY date DESC) AS n FROM bars WHERE ticker IN ({qs})) WHERE n = 2""", part)
+                out.update({t: (d, c) for t, d, c in rows})
+        return out
+
+    def drop(self, tickers):
+        with self.lock, self.conn:
+            self.conn.executemany("DELETE FROM bars WHERE ticker = ?", [(t,) for t in tickers])
+            self.conn.executemany("DELETE FROM meta WHERE ticker = ?", [(t,) for t in tickers])
+
+    def upsert(self, frames, covered_from=None, fetched_at=None):
+        fetched_at = fetched_at or time.time()
+        with self.lock, self.conn:
+            for t, df in frames.items():
+                rows = [(t, d.strftime("%Y-%m-%d"), *map(float, vals)) for d, vals in zip(df.index, df[OHLCV_FIELDS].to_numpy()) if not pd.isna(vals[3])]
+                self.conn.executemany("INSERT OR REPLACE INTO bars VALUES (?, ?, ?, ?, ?, ?, ?)", rows)
+                self.conn.execute("""INSERT INTO meta (ticker, covered_from, fetched_at, accessed_at) VALUES (?, ?, ?, ?)
+                    ON CONFLICT(ticker) DO UPDATE SET fetched_at = excluded.fetched_at,
+                    covered_from = COALESCE(MIN(meta.covered_from, excluded.covered_from), meta.covered_from, excluded.covered_from)""",
+                    (t, str(covered_from) if covered_from else None, fetched_at, fetched_at))
+
+    def load(self, tickers, start):
+        frames, now = {}, time.time()
+        with self.lock:
+            for t in tickers:
+                rows = self.conn.execute("SELECT date, open, high, low, close, volume FROM bars WHERE ticker = ? AND date >= ? ORDER BY date", (t, str(start))).fetchall()
+                if not rows: continue
+                df = pd.DataFrame([r[1:] for r in rows], columns=OHLCV_FIELDS, index=pd.DatetimeIndex([r[0] for r in rows], name="Date"))
+                frames[t] = df
+            with self.conn:
+                self.conn.executemany("UPDATE meta SET accessed_at = ? WHERE ticker = ?", [(now, t) for t in frames])
+        return frames
+
+    def evict(self):
+        # Batas ukuran: buang ticker yang paling lama tidak diakses sampai jumlah bar <= max_rows.
+        with self.lock, self.conn:
+            total = self.conn.execute("SELECT COUNT(*) FROM bars").fetchone()[0]
+            if total <= self.max_rows: return 0
+            victims = []
+            for t, n in self.conn.execute("""SELECT m.ticker, COUNT(b.date) FROM meta m LEFT JOIN bars b ON b.ticker = m.ticker
+                    GROUP BY m.ticker ORDER BY m.accessed_at"""):
+                if total <= self.max_rows: break
+                victims.append(t); total -= n
+            self.conn.executemany("DELETE FROM bars WHERE ticker = ?", [(t,) for t in victims])
+            self.conn.executemany("DELETE FROM meta WHERE ticker = ?", [(t,) for t in victims])
+            return len(victims)
+
+
+class CachedProvider(DataProvider):
+    def __init__(self, inner, store, intraday_ttl=900):
+        self.inner = inner
+        self.store = store
+        self.intraday_ttl = intraday_ttl
+
+    @property
+    def offline(self):
+        return self.inner.offline
+
+    def get_history(self, tickers, period=DEFAULT_PERIOD, start=None, now=None):
+        return self.fetch(tickers, period, start, now=now)[0]
+
+    def fetch(self, tickers, period=DEFAULT_PERIOD, start=None, on_progress=None, now=None):
+        now = now or datetime.now(WIB)
+        tickers = list(tickers)
+        need_from = pd.Timestamp(start).date() if start is not None else period_to_start(period, now.replace(tzinfo=None))
+        meta = self.store.meta(tickers)
+        full, stale = [], []
+        for t in tickers:
+            covered_from, last_date, fetched_at = meta.get(t, (None, None, None))
+            if last_date is None or covered_from is None or covered_from > str(need_from): full.append(t)
+            elif is_stale(fetched_at, now, self.intraday_ttl): stale.append(t)
+        # Inkremental dari bar pembanding (bar final kedua dari belakang); ticker dengan satu bar dari bar terakhir.
+        anchors = self.store.anchors(stale)
+        incremental = {}
+        for t in stale: incremental.setdefault(anchors[t][0] if t in anchors else meta[t][1], []).append(t)
+
+        # Ticker yang masih segar di cache langsung dihitung selesai; sisanya maju per chunk yang terunduh.
+        state = {"done": len(tickers) - len(full) - sum(map(len, incremental.values()))}
+        def progress(group_done):
+            def report(done, _, item):
+                if on_progress: on_progress(group_done + done, len(tickers), item)
+            return report
+        if on_progress: on_progress(state["done"], len(tickers), None)
+
+        fetched_at = now.timestamp()
+        failures = []
+        if full:
+            panel, failed = self.inner.fetch(full, period=period, start=start, on_progress=progress(state["done"]))
+            self.store.upsert({t: panel_ticker(panel, t) for t in panel_tickers(panel)}, covered_from=need_from, fetched_at=fetched_at)
+            failures += failed; state["done"] += len(full)
+        adjusted = []
+        for since, group in incremental.items():
+            panel, failed = self.inner.fetch(group, start=since, on_progress=progress(state["done"]))
+            frames = {t: df for t in panel_tickers(panel) if not (df := panel_ticker(panel, t)).empty}
+            adjusted += [t for t, df in frames.items() if self.adjusted(anchors.get(t), df)]
+            # upsert menandai segar hanya ticker yang kembali dengan bar. Bar pembanding selalu ikut terunduh
+            # (juga di hari libur), jadi ticker yang tidak kembali gagal: tetap basi dan dilaporkan.
+            self.store.upsert({t: df for t, df in frames.items() if t not in adjusted}, fetched_at=fetched_at)
+            reported = {f.ticker for f in failed}
+            failed += [ScanFailure(t, "Tidak ada data dari sumber", 1) for t in group if t not in frames and t not in reported]
+            failures += failed; state["done"] += len(group)
+        if adjusted:
+            # Riwayat lama sudah tidak sebanding; ganti seluruhnya. Bila unduhan ulang gagal, bar lama dipakai
+            # dulu dan ticker itu tetap basi sehingga dicoba lagi pada scan berikutnya.
+            panel, failed = self.inner.fetch(adjusted, period=period, start=start)
+            frames = {t: panel_ticker(panel, t) for t in panel_tickers(panel)}
+            self.store.drop(list(frames))
+            self.store.upsert(frames, covered_from=need_from, fetched_at=fetched_at)
+            failures += failed
+
+        frames = self.store.load(tickers, need_from)
+        self.store.evict()
+        return make_panel(frames), failures
+
+    @staticmethod
+    def adjusted(anchor, df):
+        # True bila Close bar pembanding hasil unduhan baru berbeda dari yang tersimpan (split/dividen).
+        if anchor is None: return False
+        date, close = pd.Timestamp(anchor[0]), anchor[1]
+        if date not in df.index or pd.isna(df.at[date, "Close"]) or not close: return False
+        return abs(df.at[date, "Close"] / close - 1) > ADJUST_TOLERANCE
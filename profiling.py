@@ -0,0 +1,45 @@
+# --- PROFIL WAKTU PEMINDAIAN ---
+# Waktu per tahap (fetch, indikator, order block, struktur, tabel, ...) dan latensi per ticker untuk satu
+# scan. run_scan() mengembalikannya bersama hasil scan; dashboard menampilkannya di panel diagnostik dan
+# bench.py memakai format JSON yang sama.
+import json
+import time
+from contextlib import contextmanager
+
+import numpy as np
+
+PERCENTILES = (50, 90, 95, 99)
+
+
+class ScanProfile:
+    def __init__(self):
+        self.stages = {}     # tahap -> detik, urut pertama kali dicatat
+        self.latencies = {}  # ticker -> detik
+
+    @contextmanager
+    def stage(self, name):
+        t0 = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.stages[name] = self.stages.get(name, 0.0) + time.perf_counter() - t0
+
+    def record(self, tickers, seconds):
+        # Latensi satu permintaan dibebankan ke semua ticker di dalamnya (mis. satu chunk yf.download).
+        for t in tickers: self.latencies[t] = self.latencies.get(t, 0.0) + seconds
+
+    def percentiles(self, q=PERCENTILES):
+        if not self.latencies: return {}
+        values = np.fromiter(self.latencies.values(), dtype=float)
+        return {f"p{p}": float(np.percentile(values, p)) for p in q}
+
+    def to_dict(self):
+        return {
+            "stages_ms": {k: round(v * 1000, 3) for k, v in self.stages.items()},
+            "total_ms": round(sum(self.stages.values()) * 1000, 3),
+            "tickers_timed": len(self.latencies),
+            "latency_ms": {k: round(v * 1000, 3) for k, v in self.percentiles().items()},
+        }
+
+    def to_json(self, **kwargs):
+        return json.dumps(self.to_dict(), **kwargs)
@@ -0,0 +1,97 @@
+# --- PENYIMPANAN HASIL SCAN KOLOMNAR ---
+# Tabel hasil bertipe ringkas (kategori untuk label, numerik di-downcast) dan riwayat OHLCV + indikator
+# untuk chart disimpan terpisah di HistoryStore: satu array float32 untuk semua ticker, DataFrame per
+# ticker baru dibuat ketika baris dipilih.
+import numpy as np
+import pandas as pd
+
+CATEGORY_COLUMNS = ["Sektor", "Structure", "MA20", "MA50"]
+DTYPES = {"Harga": "int32", "Skor": "int16", "Chg %": "float32", "Jarak Entry (%)": "float32",
+          "Vol Ratio": "float32", "RSI": "float32"}
+DECIMALS = {"Chg %": 2, "Jarak Entry (%)": 2, "Vol Ratio": 2, "RSI": 1}
+HISTORY_COLUMNS = ["Open", "High", "Low", "Close", "Volume", "MA20", "MA50", "RSI", "Avg_Vol_5"]
+
+
+def compact_table(table):
+    table = table.copy()
+    table["Jarak Entry (%)"] = pd.to_numeric(table["Jarak Entry (%)"], errors="coerce")
+    table = table.astype({c: t for c, t in DTYPES.items() if c in table})
+    for c in CATEGORY_COLUMNS:
+        if c in table: table[c] = table[c].astype("category")
+    return table.reset_index(drop=True)
+
+
+def with_metadata(table, meta):
+    # Nama/Sektor terbaru dari MetadataStore; assign() membuat salinan kecil, tabel bersama tidak diubah.
+    return table.assign(Nama=lambda d: d["Ticker"].map(meta.name), Sektor=lambda d: d["Ticker"].map(meta.sector).astype("category"))
+
+
+def filter_table(table, sectors, min_score):
+    # Tabel dashboard: filter sektor dan skor minimal, urut Skor tertinggi.
+    return table[table["Sektor"].isin(sectors) & (table["Skor"] >= min_score)].sort_values("Skor", ascending=False)
+
+
+def export_table(table):
+    # float32 -> float64 dibulatkan lagi, supaya CSV / prompt AI tidak memuat ekor 1.2300000190734863.
+    out = table.copy()
+    for c, d in DECIMALS.items():
+        if c in out: out[c] = out[c].astype("float64").round(d)
+    return out
+
+
+class HistoryStore:
+    def __init__(self, tickers, offsets, dates, values, columns=HISTORY_COLUMNS):
+        self.tickers = list(tickers)
+        self.index = {t: i for i, t in enumerate(self.tickers)}
+        self.offsets = offsets    # (n+1,) int64, baris ticker i = offsets[i]:offsets[i+1]
+        self.dates = dates        # (N,) datetime64[ns]
+        self.values = values      # (N, kolom) float32
+        self.columns = list(columns)
+
+    @classmethod
+    def from_arrays(cls, tickers, lengths, dates, arrays, columns=HISTORY_COLUMNS):
+        # arrays: {kolom: (n, L)} rata kanan (indicators.stack_panel) -> simpan hanya bar milik tiap ticker.
+        lengths = np.asarray(lengths, dtype=np.int64)
+        L = dates.shape[1]
+        own = np.arange(L)[None, :] >= (L - lengths)[:, None]
+        values = np.stack([arrays[c][own] for c in columns], axis=1).astype(np.float32)
+        offsets = np.concatenate([[0], np.cumsum(lengths)])
+        return cls(tickers, offsets, dates[own], values, columns)
+
+    @classmethod
+    def from_frame(cls, df):
+        # Format panjang (Ticker, Date, kolom...) dari snapshot Parquet.
+        df = df.assign(Ticker=df["Ticker"].astype(str)).sort_values(["Ticker", "Date"], kind="stable")
+        tickers, counts = np.unique(df["Ticker"].to_numpy(dtype=str), return_counts=True)
+        columns = [c for c in df.columns if c not in ("Ticker", "Date")]
+        return cls(tickers, np.concatenate([[0], np.cumsum(counts)]), df["Date"].to_numpy(dtype="datetime64[ns]"),
+                   df[columns].to_numpy(dtype=np.float32), columns)
+
+    @classmethod
+    def concat(cls, stores):
+        # Gabung store dengan ticker berbeda (mis. ticker yang baru bergabung di mode live) menjadi satu.
+        counts = np.concatenate([np.diff(s.offsets) for s in stores])
+        return cls([t for s in stores for t in s.tickers], np.concatenate([[0], np.cumsum(counts)]),
+                   np.concatenate([s.dates for s in stores]), np.concatenate([s.values for s in stores]), stores[0].columns)
+
+    def to_frame(self):
+        counts = np.diff(self.offsets)
+        df = pd.DataFrame(self.values, columns=self.columns)
+        df.insert(0, "Date", self.dates)
+        df.insert(0, "Ticker", pd.Categorical(np.repeat(self.tickers, counts), categories=self.tickers))
+        return df
+
+    def __contains__(self, t):
+        return t in self.index
+
+    def __len__(self):
+        return len(self.tickers)
+
+    @property
+    def nbytes(self):
+        return self.values.nbytes + self.dates.nbytes + self.offsets.nbytes
+
+    def frame(self, t):
+        i = self.index[t]; s, e = self.offsets[i], self.offsets[i + 1]
+        return pd.DataFrame(self.values[s:e].astype(np.float64), columns=self.columns,
+                            index=pd.DatetimeIndex(self.dates[s:e], name="Date"))
@@ -0,0 +1,45 @@
+# --- PEMINDAIAN HEADLESS (CRON / BATCH) ---
+# Menjalankan pipeline yang sama dengan tombol "Jalankan Pemindaian" tanpa Streamlit, lalu menulis
+# snapshot yang langsung dimuat dashboard. Contoh crontab (pasca penutupan, Senin-Jumat 16:30 WIB):
+#   30 16 * * 1-5  cd /path/ke/repo && python scan_cli.py --keep 20
+import argparse
+import sys
+import time
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Pemindaian saham BEI tanpa UI, hasil ditulis sebagai snapshot Parquet.")
+    ap.add_argument("--tickers", help="daftar ticker dipisah koma (default: daftar bawaan dashboard)")
+    ap.add_argument("--tickers-file", help="file berisi ticker, dipisah koma/baris")
+    ap.add_argument("--out", default=None, help="folder snapshot (default: SCREENER_SNAPSHOTS atau ./snapshots)")
+    ap.add_argument("--keep", type=int, default=0, help="simpan N snapshot terbaru saja (0 = simpan semua)")
+    ap.add_argument("--profile", help="tulis profil waktu per tahap (JSON) ke file ini")
+    ap.add_argument("--metadata-wait", type=float, default=30,
+                    help="detik maksimum menunggu refresh nama/sektor di background (0 = tidak menunggu)")
+    args = ap.parse_args(argv)
+
+    # Impor ditunda sampai argumen valid supaya --help tetap instan.
+    import scanner
+    from snapshot import SNAPSHOT_DIR, prune_snapshots, save_snapshot
+
+    raw = args.tickers or (open(args.tickers_file, encoding="utf-8").read() if args.tickers_file else scanner.DEFAULT_TICKERS)
+    t_list = scanner.parse_tickers(raw)
+    out_dir = args.out or SNAPSHOT_DIR
+    t0 = time.time()
+    meta = scanner.load_metadata_store()
+    table, history, failures, scanned_at, profile = scanner.run_scan(t_list, meta, on_status=print)
+    path = save_snapshot(table, history, failures, scanned_at, out_dir, profile)
+    if args.profile:
+        with open(args.profile, "w", encoding="utf-8") as f: f.write(profile.to_json(indent=1))
+    n = 0 if table is None else len(table)
+    if args.keep and n: prune_snapshots(args.keep, out_dir)  # scan kosong tidak menggeser snapshot yang baik
+    print(f"{n} hasil, {len(failures)} gagal, {time.time() - t0:.1f} detik -> {path}")
+    if meta.refreshing and args.metadata_wait > 0:
+        # Tunggu refresh metadata sebentar; yang belum selesai tetap disimpan dan dilanjutkan scan berikutnya.
+        meta.refreshing.join(args.metadata_wait)
+        if meta.refreshing.is_alive(): meta.save()
+    return 0 if n else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
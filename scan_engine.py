@@ -0,0 +1,92 @@
+# --- MESIN PEMINDAIAN PARALEL ---
+# Worker pool berbatas + token bucket + retry dengan backoff. Kegagalan per ticker dilaporkan
+# sebagai ScanFailure, bukan None yang hilang diam-diam.
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import dataclass
+
+
+class TokenBucket:
+    # rate token/detik, kapasitas = burst maksimum. acquire() memblokir sampai token tersedia.
+    def __init__(self, rate, capacity=None):
+        self.rate = float(rate)
+        self.capacity = float(capacity if capacity is not None else max(1.0, rate))
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self, n=1):
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= n:
+                    self.tokens -= n
+                    return
+                wait = (n - self.tokens) / self.rate
+            time.sleep(wait)
+
+    def pause(self, seconds):
+        # Semua pemanggil acquire() menunggu minimal `seconds` (mis. setelah HTTP 429 dari server).
+        with self.lock:
+            now = time.monotonic()
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate, -seconds * self.rate)
+            self.updated = now
+
+
+@dataclass
+class ScanFailure:
+    ticker: str
+    error: str
+    attempts: int
+
+
+class ScanEngine:
+    def __init__(self, workers=8, rate=10.0, retries=3, backoff=0.5, limiter=None, timed=False):
+        self.workers = max(1, int(workers))
+        self.retries = max(1, int(retries))
+        self.backoff = backoff
+        self.limiter = limiter if limiter is not None else (TokenBucket(rate) if rate else None)
+        # item -> detik di worker (termasuk retry), untuk profiling.ScanProfile. Hanya diisi bila timed=True:
+        # engine yang hidup sepanjang proses (GeminiClient) tidak boleh menumpuk satu entri per item.
+        self.timed = timed
+        self.timings = {}
+
+    def call(self, fn, item):
+        # Kembalikan (hasil, jumlah percobaan); exception terakhir diteruskan setelah retry habis.
+        for attempt in range(1, self.retries + 1):
+            if self.limiter: self.limiter.acquire()
+            try:
+                return fn(item), attempt
+            except Exception:
+                if attempt == self.retries: raise
+                time.sleep(self.backoff * (2 ** (attempt - 1)) * (1 + random.random() * 0.25))
+
+    def map(self, fn, items, on_progress=None):
+        # on_progress(selesai, total, item) dipanggil di thread pemanggil (aman untuk st.progress).
+        items = list(items)
+        results, failures = {}, []
+        if not items: return results, failures
+        with ThreadPoolExecutor(max_workers=min(self.workers, len(items))) as pool:
+            futures = {pool.submit(self._run, fn, it): it for it in items}
+            for done, fut in enumerate(as_completed(futures), 1):
+                it = futures[fut]
+                value, attempts, error = fut.result()
+                if error is not None: failures.append(ScanFailure(str(it), error, attempts))
+                elif value is None: failures.append(ScanFailure(str(it), "Tidak ada hasil (data kurang)", attempts))
+                else: results[it] = value
+                if on_progress: on_progress(done, len(items), it)
+        return results, failures
+
+    def _run(self, fn, item):
+        t0 = time.perf_counter()
+        try:
+            value, attempts = self.call(fn, item)
+            return value, attempts, None
+        except Exception as e:
+            return None, self.retries, f"{type(e).__name__}: {e}"
+        finally:
+            if self.timed: self.timings[item] = time.perf_counter() - t0
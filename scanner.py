@@ -0,0 +1,209 @@
+# --- LOGIKA PEMINDAIAN (TANPA UI) ---
+# Dipakai oleh app.py (Streamlit) dan scan_cli.py (cron/headless). Modul ini sengaja tidak mengimpor
+# streamlit/plotly, dan yfinance baru diimpor saat benar-benar dibutuhkan.
+import os
+from datetime import datetime, timedelta, timezone
+
+import numpy as np
+
+from data_provider import get_provider, panel_ticker
+from indicators import MIN_BARS, compute_indicators, score_table, stack_panel
+from metadata_store import MetadataStore
+from profiling import ScanProfile
+from result_store import HISTORY_COLUMNS, HistoryStore, compact_table
+from scan_engine import ScanEngine, ScanFailure
+from smc import last_order_block, market_structure, trading_setup
+
+WIB = timezone(timedelta(hours=7))
+
+# --- KONFIGURASI MESIN SCAN ---
+SCAN_WORKERS = int(os.environ.get("SCAN_WORKERS", 16))
+SCAN_RATE = float(os.environ.get("SCAN_RATE", 20))  # request/detik ke sumber data (satu request per ticker)
+SCAN_RETRIES = int(os.environ.get("SCAN_RETRIES", 3))
+
+# --- KONFIGURASI METADATA EMITEN ---
+METADATA_PATH = os.environ.get("SCREENER_METADATA", os.path.join("cache", "metadata.json"))
+LISTINGS_PATH = os.environ.get("SCREENER_LISTINGS", os.path.join("data", "idx_listings.csv"))
+
+DEFAULT_TICKERS = (
+    "AALI, ABBA, ABDA, ABMM, ACES, ACST, ADES, ADHI, AISA, AKKU, AKPI, AKRA, AKSI, ALDO, ALKA, ALMI, ALTO, AMAG, "
+    "AMFG, AMIN, AMRT, ANJT, ANTM, APEX, APIC, APII, APLI, APLN, ARGO, ARII, ARNA, ARTA, ARTI, ARTO, ASBI, ASDM, "
+    "ASGR, ASII, ASJT, ASMI, ASRI, ASRM, ASSA, ATIC, AUTO, BABP, BACA, BAJA, BALI, BAPA, BATA, BAYU, BBCA, BBHI, "
+    "BBKP, BBLD, BBMD, BBNI, BBRI, BBRM, BBTN, BBYB, BCAP, BCIC, BCIP, BDMN, BEKS, BEST, BFIN, BGTG, BHIT, BIKA, "
+    "BIMA, BINA, BIPI, BIPP, BIRD, BISI, BJBR, BJTM, BKDP, BKSL, BKSW, BLTA, BLTZ, BMAS, BMRI, BMSR, BMTR, BNBA, "
+    "BNBR, BNGA, BNII, BNLI, BOLT, BPFI, BPII, BRAM, BRMS, BRNA, BRPT, BSDE, BSIM, BSSR, BSWD, BTEK, BTEL, BTON, "
+    "BTPN, BUDI, BUKK, BULL, BUMI, BUVA, BVIC, BWPT, BYAN, CANI, CASS, CEKA, CENT, CFIN, CINT, CITA, CLPI, CMNP, "
+    "CMPP, CNKO, CNTX, COWL, CPIN, CPRO, CSAP, CTBN, CTRA, CTTH, DART, DEFI, DEWA, DGIK, DILD, DKFT, DLTA, DMAS, "
+    "DNAR, DNET, DOID, DPNS, DSFI, DSNG, DSSA, DUTI, DVLA, DYAN, ECII, EKAD, ELSA, ELTY, EMDE, EMTK, ENRG, EPMT, "
+    "ERAA, ERTX, ESSA, ESTI, ETWA, EXCL, FAST, FASW, FISH, FMII, FORU, FPNI, GAMA, GDST, GDYR, GEMA, GEMS, GGRM, "
+    "GIAA, GJTL, GLOB, GMTD, GOLD, GOLL, GPRA, GSMF, GTBO, GWSA, GZCO, HADE, HDFA, HERO, HEXA, HITS, HMSP, HOME, "
+    "HOTL, HRUM, IATA, IBFN, IBST, ICBP, ICON, IGAR, IIKP, IKAI, IKBI, IMAS, IMJS, IMPC, INAF, INAI, INCI, INCO, "
+    "INDF, INDR, INDS, INDX, INDY, INKP, INPC, INPP, INRU, INTA, INTD, INTP, IPOL, ISAT, ISSP, ITMA, ITMG, JAWA, "
+    "JECC, JIHD, JKON, JPFA, JRPT, JSMR, JSPT, JTPE, KAEF, KARW, KBLI, KBLM, KBLV, KBRI, KDSI, KIAS, KICI, KIJA, "
+    "KKGI, KLBF, KOBX, KOIN, KONI, KOPI, KPIG, KRAS, KREN, LAPD, LCGP, LEAD, LINK, LION, LMAS, LMPI, LMSH, LPCK, "
+    "LPGI, LPIN, LPKR, LPLI, LPPF, LPPS, LRNA, LSIP, LTLS, MAGP, MAIN, MAPI, MAYA, MBAP, MBSS, MBTO, MCOR, MDIA, "
+    "MDKA, MDLN, MDRN, MEDC, MEGA, MERK, META, MFMI, MGNA, MICE, MIDI, MIKA, MIRA, MITI, MKPI, MLBI, MLIA, MLPL, "
+    "MLPT, MMLP, MNCN, MPMX, MPPA, MRAT, MREI, MSKY, MTDL, MTFN, MTLA, MTSM, MYOH, MYOR, MYTX, NELY, NIKL, NIRO, "
+    "NISP, NOBU, NRCA, OCAP, OKAS, OMRE, PADI, PALM, PANR, PANS, PBRX, PDES, PEGE, PGAS, PGLI, PICO, PJAA, PKPK, "
+    "PLAS, PLIN, PNBN, PNBS, PNIN, PNLF, PNSE, POLY, POOL, PPRO, PSAB, PSDN, PSKT, PTBA, PTIS, PTPP, PTRO, PTSN, "
+    "PTSP, PUDP, PWON, PYFA, RAJA, RALS, RANC, RBMS, RDTX, RELI, RICY, RIGS, RIMO, RODA, ROTI, RUIS, SAFE, SAME, "
+    "SCCO, SCMA, SCPI, SDMU, SDPC, SDRA, SGRO, SHID, SIDO, SILO, SIMA, SIMP, SIPD, SKBM, SKLT, SKYB, SMAR, SMBR, "
+    "SMCB, SMDM, SMDR, SMGR, SMMA, SMMT, SMRA, SMRU, SMSM, SOCI, SONA, SPMA, SQMI, SRAJ, SRIL, SRSN, SRTG, SSIA, "
+    "SSMS, SSTM, STAR, STTP, SUGI, SULI, SUPR, TALF, TARA, TAXI, TBIG, TBLA, TBMS, TCID, TELE, TFCO, TGKA, TIFA, "
+    "TINS, TIRA, TIRT, TKIM, TLKM, TMAS, TMPO, TOBA, TOTL, TOTO, TOWR, TPIA, TPMA, TRAM, TRIL, TRIM, TRIO, TRIS, "
+    "TRST, TRUS, TSPC, ULTJ, UNIC, UNIT, UNSP, UNTR, UNVR, VICO, VINS, VIVA, VOKS, VRNA, WAPO, WEHA, WICO, WIIM, "
+    "WIKA, WINS, WOMF, WSKT, WTON, YPAS, YULE, ZBRA, SHIP, CASA, DAYA, DPUM, IDPR, JGLE, KINO, MARI, MKNT, MTRA, "
+    "OASA, POWR, INCF, WSBP, PBSA, PRDA, BOGA, BRIS, PORT, CARS, MINA, CLEO, TAMU, CSIC, TGRA, FIRE, TOPS, KMTR, "
+    "ARMY, MAPB, WOOD, HRTA, MABA, HOKI, MPOW, MARK, NASA, MDKI, BELL, KIOS, GMFI, MTWI, ZINC, MCAS, PPRE, WEGE, "
+    "PSSI, MORA, DWGL, PBID, JMAS, CAMP, IPCM, PCAR, LCKM, BOSS, HELI, JSKY, INPS, GHON, TDPM, DFAM, NICK, BTPS, "
+    "SPTO, PRIM, HEAL, TRUK, PZZA, TUGU, MSIN, SWAT, TNCA, MAPA, TCPI, IPCC, RISE, BPTR, POLL, NFCX, MGRO, NUSA, "
+    "FILM, ANDI, LAND, MOLI, PANI, DIGI, CITY, SAPX, SURE, HKMU, MPRO, DUCK, GOOD, SKRN, YELO, CAKK, SATU, SOSS, "
+    "DEAL, POLA, DIVA, LUCK, URBN, SOTS, ZONE, PEHA, FOOD, BEEF, POLI, CLAY, NATO, JAYA, COCO, MTPS, CPRI, HRME, "
+    "POSA, JAST, FITT, BOLA, CCSI, SFAN, POLU, KJEN, KAYU, ITIC, PAMG, IPTV, BLUE, ENVY, EAST, LIFE, FUJI, KOTA, "
+    "INOV, ARKA, SMKL, HDIT, KEEN, BAPI, TFAS, GGRP, OPMS, NZIA, SLIS, PURE, IRRA, DMMX, SINI, WOWS, ESIP, TEBE, "
+    "KEJU, PSGO, AGAR, IFSH, REAL, IFII, PMJS, UCID, GLVA, PGJO, AMAR, CSRA, INDO, AMOR, TRIN, DMND, PURA, PTPW, "
+    "TAMA, IKAN, SAMF, SBAT, KBAG, CBMF, RONY, CSMI, BBSS, BHAT, CASH, TECH, EPAC, UANG, PGUN, SOFA, PPGL, TOYS, "
+    "SGER, TRJA, PNGO, SCNP, BBSI, KMDS, PURI, SOHO, HOMI, ROCK, ENZO, PLAN, PTDU, ATAP, VICI, PMMP, BANK, WMUU, "
+    "EDGE, UNIQ, BEBS, SNLK, ZYRX, LFLO, FIMP, TAPG, NPGF, LUCY, ADCP, HOPE, MGLV, TRUE, LABA, ARCI, IPAC, MASB, "
+    "BMHS, FLMC, NICL, UVCR, BUKA, HAIS, OILS, GPSO, MCOL, RSGK, RUNS, SBMA, CMNT, GTSI, IDEA, KUAS, BOBA, MTEL, "
+    "DEPO, BINO, CMRY, WGSH, TAYS, WMPP, RMKE, OBMD, AVIA, IPPE, NASI, BSML, DRMA, ADMR, SEMA, ASLC, NETV, BAUT, "
+    "ENAK, NTBK, SMKM, STAA, NANO, BIKE, WIRG, SICO, GOTO, TLDN, MTMH, WINR, IBOS, OLIV, ASHA, SWID, TRGU, ARKO, "
+    "CHEM, DEWI, AXIO, KRYA, HATM, RCCC, GULA, JARR, AMMS, RAFI, KKES, ELPI, EURO, KLIN, TOOL, BUAH, CRAB, MEDS, "
+    "COAL, PRAY, CBUT, BELI, MKTR, OMED, BSBK, PDPP, KDTN, ZATA, NINE, MMIX, PADA, ISAP, VTNY, SOUL, ELIT, BEER, "
+    "CBPE, SUNI, CBRE, WINE, BMBL, PEVE, LAJU, FWCT, NAYZ, IRSX, PACK, VAST, CHIP, HALO, KING, PGEO, FUTR, HILL, "
+    "BDKR, PTMP, SAGE, TRON, CUAN, NSSS, GTRA, HAJJ, JATI, TYRE, MPXL, SMIL, KLAS, MAXI, VKTR, RELF, AMMN, CRSN, "
+    "GRPM, WIDI, TGUK, INET, MAHA, RMKO, CNMA, FOLK, HBAT, GRIA, PPRI, ERAL, CYBR, MUTU, LMAX, HUMI, MSIE, RSCH, "
+    "BABY, AEGS, IOTF, KOCI, PTPS, BREN, STRK, KOKA, LOPI, UDNG, RGAS, MSTI, IKPM, AYAM, SURI, ASLI, GRPH, SMGA, "
+    "UNTD, TOSK, MPIX, ALII, MKAP, MEJA, LIVE, HYGN, BAIK, VISI, AREA, MHKI, ATLA, DATA, SOLA, BATR, SPRE, PART, "
+    "GOLF, ISEA, BLESS, GUNA, LABS, DOSS, NEST, PTMR, VERN, DAAZ, BOAT, NAIK, AADI, MDIY, KSIX, RATU, YOII, HGII, "
+    "BRRC, DGWG, CBDK, OBAT, MINES, ASPR, PSAT, COIN, CDIA, BLOG, MERI, CHEK, PMUI, EMAS, PJHB, RLCO, SUPA, KAQI, "
+    "YUPI, FORE, MDLA, DKHH, AYLS, DADA, ASPI, ESTA, BESS, AMAN, CARE, PIPA, NCKL, MENN, AWAN, MBMA, RAAM, DOOH, "
+    "CGAS, NICE, MSJA, SMLE, ACRO, MANG, WIFI, FAPA, DCII, KETR, DGNS, UFOE, ADMF, ADMG, ADRO, AGII, AGRO, AGRS, "
+    "AHAP, AIMS"
+)
+
+# --- LOGIKA TEKNIKAL ---
+def calculate_rsi(data, window=14):
+    delta = data.diff()
+    gain = (delta.where(delta > 0, 0)).rolling(window=window).mean()
+    loss = (-delta.where(delta < 0, 0)).rolling(window=window).mean()
+    rs = gain / loss.replace(0, np.nan)
+    return (100 - (100 / (1 + rs))).fillna(50)
+
+def ohlc_rows(df):
+    return [df[c].to_numpy(dtype=float)[None, :] for c in ['Open', 'High', 'Low', 'Close']]
+
+def detect_market_structure(df):
+    _, high, _, close = ohlc_rows(df)
+    return market_structure(high, close)[0]
+
+def find_order_blocks(df):
+    idx, low, high = (a[0] for a in last_order_block(*ohlc_rows(df)))
+    if idx < 0: return None
+    return {'type': 'Bullish OB', 'low': low, 'high': high, 'index': df.index[idx]}
+
+def get_trading_setup(price, ob):
+    if not ob: return None
+    entry = price if price < ob['high'] * 1.03 else ob['high']
+    sl = ob['low'] * 0.992
+    risk = entry - sl
+    if risk <= 0: return None
+    return {"Entry": entry, "SL": sl, "TP": entry + (risk * 2)}
+
+def get_signals(t, panel=None, meta=None):
+    # Exception sengaja diteruskan: ScanEngine yang me-retry dan mencatat kegagalan per ticker.
+    # Dengan meta (MetadataStore), nama/sektor dibaca dari cache dan ticker.info tidak dipanggil.
+    # yfinance hanya diimpor bila panel atau meta tidak diberikan (jalur lama per ticker via jaringan).
+    if panel is None or meta is None:
+        import yfinance as yf
+        ticker = yf.Ticker(t)
+    df = panel_ticker(panel, t) if panel is not None else ticker.history(period="120d")
+    if df.empty or len(df) < 50: return None
+    df['MA20'] = df['Close'].rolling(20).mean()
+    df['MA50'] = df['Close'].rolling(50).mean()
+    df['RSI'] = calculate_rsi(df['Close'])
+    df['Avg_Vol_5'] = df['Volume'].shift(1).rolling(5).mean()
+    last = df.iloc[-1]; price = last['Close']
+    v_ratio = last['Volume'] / last['Avg_Vol_5'] if last['Avg_Vol_5'] > 0 else 0
+    struct = detect_market_structure(df)
+    
+    # Perhitungan Jarak Entry SMC
+    ob = find_order_blocks(df)
+    setup = get_trading_setup(price, ob)
+    jarak_entry = None
+    if setup:
+        jarak_entry = round(((price - setup['Entry']) / setup['Entry']) * 100, 2)
+
+    v_score = 40 if v_ratio > 2.0 else (20 if v_ratio > 1.5 else 5)
+    ma_score = 30 if price > last['MA50'] else 0
+    rsi_score = 20 if last['RSI'] < 35 else (10 if last['RSI'] < 65 else 0)
+    smc_score = 10 if struct == "BOS Bullish" else 0
+    
+    return {
+        "Ticker": t, "Nama": meta.name(t) if meta else ticker.info.get('longName', t),
+        "Sektor": meta.sector(t) if meta else ticker.info.get('sector', 'Lainnya'), "Harga": int(round(price)),
+        "Chg %": round(((price - df.iloc[-2]['Close']) / df.iloc[-2]['Close']) * 100, 2),
+        "Skor": int(v_score + ma_score + rsi_score + smc_score),
+        "Jarak Entry (%)": jarak_entry,
+        "Vol Ratio": round(v_ratio, 2), "RSI": round(last['RSI'], 1),
+        "Structure": struct, "MA20": "Bullish ✅" if price > last['MA20'] else "Bearish ❌",
+        "MA50": "Atas ⬆️" if price > last['MA50'] else "Bawah ⬇️", "df": df
+    }
+
+def signal_table(tickers, close, volume, ind, structure, ob_low, ob_high, meta):
+    # Baris hasil dari bar terakhir tiap ticker + Jarak Entry dari order block terakhir (dipakai juga oleh
+    # streaming.LiveScanner, yang cukup memberi dua kolom terakhir: bar sebelumnya dan bar terakhir).
+    valid, entry, _, _ = trading_setup(close[:, -1], ob_low, ob_high)
+    with np.errstate(invalid="ignore"): jarak = np.round((close[:, -1] - entry) / entry * 100, 2)
+    table = score_table(tickers, close, volume, ind, structure=structure,
+                        jarak_entry=[j if k else None for j, k in zip(jarak, valid)])
+    table.insert(1, "Nama", table['Ticker'].map(meta.name)); table.insert(2, "Sektor", table['Ticker'].map(meta.sector))
+    return table
+
+def get_signals_batch(t_list, panel, meta, on_progress=None, profile=None):
+    # Versi universe dari get_signals: indikator, Skor dan deteksi SMC dihitung sekaligus untuk semua
+    # ticker (indicators.py, smc.py). Mengembalikan (tabel ringkas, HistoryStore untuk chart, list ScanFailure).
+    profile = profile if profile is not None else ScanProfile()
+    with profile.stage("stack"): arrays, tickers, lengths = stack_panel(panel, t_list)
+    ok = lengths >= MIN_BARS
+    failures = [ScanFailure(t, "Tidak ada hasil (data kurang)", 1) for t, k in zip(tickers, ok) if not k]
+    tickers = [t for t, k in zip(tickers, ok) if k]
+    if not tickers: return None, None, failures
+    o, h, l, c, v = (arrays[f][ok] for f in ['Open', 'High', 'Low', 'Close', 'Volume'])
+    with profile.stage("indikator"): ind = compute_indicators(c, v)
+    with profile.stage("order_block"): _, ob_low, ob_high = last_order_block(o, h, l, c)
+    with profile.stage("struktur"): structure = market_structure(h, c)
+    with profile.stage("tabel"): table = compact_table(signal_table(tickers, c, v, ind, structure, ob_low, ob_high, meta))
+    cols = {'Open': o, 'High': h, 'Low': l, 'Close': c, 'Volume': v, **ind}
+    with profile.stage("history"): history = HistoryStore.from_arrays(tickers, lengths[ok], arrays['Date'][ok], cols, HISTORY_COLUMNS)
+    if on_progress: on_progress(len(tickers), len(tickers), None)
+    return table, history, failures
+
+# --- PIPELINE PEMINDAIAN ---
+def parse_tickers(text):
+    return [t.strip().upper() + (".JK" if "." not in t else "") for t in text.replace("\n", ",").split(",") if t.strip()]
+
+def load_metadata_store():
+    meta = MetadataStore(METADATA_PATH)
+    if os.path.exists(LISTINGS_PATH) and (not meta.data or os.path.getmtime(LISTINGS_PATH) > os.path.getmtime(METADATA_PATH)):
+        meta.load_listings(LISTINGS_PATH)
+    return meta
+
+def run_scan(t_list, meta, on_status=None, on_progress=None, provider=None):
+    # Unduh panel (bulk, cache), hitung sinyal seluruh universe, jadwalkan refresh metadata di background
+    # (kecuali provider offline, mis. SCREENER_DATA_DIR).
+    # provider default get_provider(); bench.py memberi provider di memori.
+    # -> (tabel hasil, HistoryStore, kegagalan, waktu scan WIB, ScanProfile)
+    profile = ScanProfile()
+    engine = ScanEngine(workers=SCAN_WORKERS, rate=SCAN_RATE, retries=SCAN_RETRIES, timed=True)
+    if on_status: on_status(f"Mengunduh data {len(t_list)} ticker...")
+    provider = provider or get_provider(engine)
+    with profile.stage("fetch"): panel, fetch_failures = provider.fetch(t_list, on_progress=on_progress)
+    for chunk, seconds in engine.timings.items(): profile.record(chunk, seconds)
+    table, history, failures = get_signals_batch(t_list, panel, meta, profile=profile)  # progres sudah 100% dari fetch
+    # Ticker tanpa data karena unduhan gagal dilaporkan dengan error aslinya, bukan "data kurang".
+    fetch_errors = {f.ticker: f for f in fetch_failures}
+    failures = [fetch_errors.get(f.ticker, f) for f in failures]
+    if not provider.offline:
+        with profile.stage("metadata"): meta.refresh_async(meta.stale(t_list), ScanEngine(workers=4, rate=2, retries=2))
+    return table, history, failures, datetime.now(WIB), profile
@@ -0,0 +1,90 @@
+# --- STORE HASIL SCAN BERSAMA (SINGLE-FLIGHT) ---
+# Satu instance per proses (app.py membungkusnya dengan st.cache_resource). Permintaan scan untuk universe
+# dan tanggal bursa yang sama digabung menjadi satu scan yang sedang berjalan; semua sesi lalu membaca
+# objek ScanResult yang sama (jangan diubah di tempat).
+import hashlib
+import threading
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+
+WIB = timezone(timedelta(hours=7))
+
+
+@dataclass(frozen=True)
+class ScanResult:
+    key: tuple
+    table: object      # DataFrame ringkas (result_store.compact_table) atau None
+    history: object    # result_store.HistoryStore atau None
+    failures: tuple
+    scanned_at: datetime
+    profile: object = None  # profiling.ScanProfile dari scan leader
+
+
+class _Flight:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+        self.progress = (0, 0, None)
+        self.status = None
+
+
+def universe_key(t_list, now=None):
+    digest = hashlib.sha1(",".join(sorted(set(t_list))).encode()).hexdigest()[:16]
+    return (digest, (now or datetime.now(WIB)).astimezone(WIB).date().isoformat())
+
+
+class SharedScanStore:
+    def __init__(self, max_age=300, max_entries=4):
+        self.max_age = max_age          # detik; hasil yang lebih tua dipindai ulang saat diminta
+        self.max_entries = max_entries  # jumlah universe/tanggal yang disimpan di memori
+        self.lock = threading.Lock()
+        self.results = {}               # key -> ScanResult (urut sisip = urut umur)
+        self.flights = {}               # key -> _Flight
+
+    def get_or_scan(self, t_list, scan_fn, on_progress=None, on_wait=None, on_status=None):
+        # scan_fn(t_list, on_progress, on_status) -> (tabel, history, kegagalan, waktu scan, profil). Scan berjalan
+        # di thread milik store, bukan thread script pemanggil, jadi rerun/stop Streamlit di sesi mana pun tidak
+        # memutusnya. Pemanggil yang memulai scan (leader) diberi progres lewat on_progress(done, total, item) dan
+        # on_status(teks); pemanggil lain lewat on_wait(done, total). Semua callback dipanggil dari thread pemanggil.
+        key = universe_key(t_list)
+        while True:
+            with self.lock:
+                cached = self.results.get(key)
+                if cached and (datetime.now(WIB) - cached.scanned_at).total_seconds() <= self.max_age: return cached
+                flight = self.flights.get(key)
+                leader = flight is None
+                if leader:
+                    flight = self.flights[key] = _Flight()
+                    threading.Thread(target=self._run, args=(key, flight, t_list, scan_fn), daemon=True, name=f"scan-{key[0]}").start()
+            seen = (None, None)
+            while True:
+                finished = flight.done.wait(0.2)
+                state = (flight.progress, flight.status)
+                if state != seen:
+                    (done, total, item), status = seen = state
+                    if leader:
+                        if on_status and status is not None: on_status(status)
+                        if on_progress and total: on_progress(done, total, item)
+                    elif on_wait: on_wait(done, total)
+                if finished: break
+            if flight.result is not None: return flight.result
+            # Scan gagal: leader menerima errornya. Follower meneruskan Exception biasa; selain itu (thread
+            # dihentikan tanpa hasil) follower mencoba lagi dan bisa menjadi leader baru.
+            if leader or isinstance(flight.error, Exception):
+                raise flight.error or RuntimeError("Scan selesai tanpa hasil")
+
+    def _run(self, key, flight, t_list, scan_fn):
+        def progress(done, total, item): flight.progress = (done, total, item)
+        def status(text): flight.status = text
+        try:
+            table, history, failures, scanned_at, profile = scan_fn(t_list, progress, status)
+            flight.result = ScanResult(key, table, history, tuple(failures), scanned_at, profile)
+            with self.lock:
+                self.results.pop(key, None); self.results[key] = flight.result
+                while len(self.results) > self.max_entries: self.results.pop(next(iter(self.results)))
+        except BaseException as e:
+            flight.error = e
+        finally:
+            with self.lock: self.flights.pop(key, None)
+            flight.done.set()
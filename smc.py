@@ -0,0 +1,70 @@
+# --- DETEKTOR SMC VEKTOR (ORDER BLOCK, SWING HIGH, BOS) ---
+# Versi array dari find_order_blocks / detect_market_structure / get_trading_setup. Input berbentuk
+# (n_ticker, n_bar) rata kanan seperti keluaran indicators.stack_panel; satu ticker cukup diberi [None, :].
+import numpy as np
+
+SWING_WINDOW = 5
+OB_LOOKAHEAD = 3
+OB_BREAK = 1.02
+
+
+def swing_highs(high, window=SWING_WINDOW):
+    # True bila High adalah maksimum jendela terpusat (rolling(window, center=True) versi lama).
+    n, L = high.shape
+    half = window // 2
+    out = np.zeros((n, L), dtype=bool)
+    if L < window: return out
+    m = L - window + 1
+    mid = high[:, half:half + m]
+    ok = ~np.isnan(mid)
+    for k in range(window):
+        win = high[:, k:k + m]
+        ok &= ~np.isnan(win) & (win <= mid)
+    out[:, half:half + m] = ok
+    return out
+
+
+def nth_last(mask, nth):
+    # Indeks kemunculan ke-nth dari belakang pada tiap baris (-1 bila tidak ada).
+    rc = np.cumsum(mask[:, ::-1], axis=1)
+    hit = (rc == nth) & mask[:, ::-1]
+    pos = np.argmax(hit, axis=1)
+    return np.where(hit.any(axis=1), mask.shape[1] - 1 - pos, -1)
+
+
+def market_structure(high, close, window=SWING_WINDOW):
+    # "BOS Bullish" bila close terakhir menembus swing high kedua dari belakang.
+    idx = nth_last(swing_highs(high, window), 2)
+    rows = np.arange(len(high))
+    last_high = np.where(idx >= 0, high[rows, np.maximum(idx, 0)], np.nan)
+    bos = (idx >= 0) & (last_high != 0) & (close[:, -1] > last_high)
+    return np.where(bos, "BOS Bullish", "Sideways/Retracement").astype(object)
+
+
+def order_blocks(open_, high, low, close, lookahead=OB_LOOKAHEAD, brk=OB_BREAK):
+    # Candle bearish yang close-nya ditembus > 2% oleh close `lookahead` bar kemudian. Bar pertama tiap
+    # ticker dan 5 bar terakhir tidak dihitung (range(1, len(df)-5) pada versi lama).
+    n, L = close.shape
+    mask = np.zeros((n, L), dtype=bool)
+    if L < 7: return mask
+    i = np.arange(1, L - 5)
+    own_prev = ~np.isnan(close[:, i - 1])
+    mask[:, i] = own_prev & (close[:, i] < open_[:, i]) & (close[:, i + lookahead] > high[:, i] * brk)
+    return mask
+
+
+def last_order_block(open_, high, low, close, **kwargs):
+    # -> (indeks OB terakhir atau -1, low OB, high OB)
+    idx = nth_last(order_blocks(open_, high, low, close, **kwargs), 1)
+    rows = np.arange(len(close)); safe = np.maximum(idx, 0)
+    return idx, np.where(idx >= 0, low[rows, safe], np.nan), np.where(idx >= 0, high[rows, safe], np.nan)
+
+
+def trading_setup(price, ob_low, ob_high, zone=1.03, sl_buffer=0.992, rr=2.0):
+    # -> (valid, entry, sl, tp) dengan RR 1:2, sama seperti get_trading_setup.
+    with np.errstate(invalid="ignore"):
+        entry = np.where(price < ob_high * zone, price, ob_high)
+        sl = ob_low * sl_buffer
+        risk = entry - sl
+        valid = ~np.isnan(ob_high) & (risk > 0)
+    return valid, entry, sl, entry + (risk * rr)
@@ -0,0 +1,58 @@
+# --- SNAPSHOT HASIL SCAN (PARQUET + RINGKASAN JSON) ---
+# Ditulis oleh scan_cli.py (mis. cron setelah penutupan bursa) dan dibaca dashboard saat dibuka.
+# Per snapshot: scan_<stamp>.parquet (tabel hasil), scan_<stamp>_history.parquet (OHLCV + indikator
+# untuk chart) dan scan_<stamp>.json (ringkasan). JSON ditulis terakhir sehingga hanya snapshot yang
+# lengkap yang terlihat.
+import glob
+import json
+import os
+from datetime import datetime
+
+import pandas as pd
+
+from result_store import HistoryStore, export_table
+
+SNAPSHOT_DIR = os.environ.get("SCREENER_SNAPSHOTS", "snapshots")
+
+
+def save_snapshot(table, history, failures, scanned_at, out_dir=SNAPSHOT_DIR, profile=None):
+    os.makedirs(out_dir, exist_ok=True)
+    base = os.path.join(out_dir, f"scan_{scanned_at.strftime('%Y%m%d_%H%M%S')}")
+    table = table if table is not None else pd.DataFrame(columns=["Ticker", "Skor", "Structure", "Jarak Entry (%)"])
+    table.to_parquet(base + ".parquet", index=False)
+    (history.to_frame() if history is not None else pd.DataFrame(columns=["Ticker", "Date"])).to_parquet(base + "_history.parquet", index=False)
+    summary = {
+        "scanned_at": scanned_at.isoformat(), "results": len(table), "failures": len(failures),
+        "avg_score": round(float(table["Skor"].mean()), 1) if len(table) else None,
+        "top": json.loads(export_table(table.nlargest(10, "Skor")[["Ticker", "Skor", "Structure", "Jarak Entry (%)"]]).to_json(orient="records")) if len(table) else [],
+        "failed": [vars(f) for f in failures],
+        "profile": profile.to_dict() if profile is not None else None,
+        "files": {"results": os.path.basename(base + ".parquet"), "history": os.path.basename(base + "_history.parquet")},
+    }
+    with open(base + ".json.tmp", "w", encoding="utf-8") as f: json.dump(summary, f, ensure_ascii=False, indent=1, default=str)
+    os.replace(base + ".json.tmp", base + ".json")
+    return base + ".json"
+
+
+def latest_snapshot(out_dir=SNAPSHOT_DIR):
+    # Snapshot terbaru yang berisi hasil; scan kosong (mis. jaringan putus saat cron) dilewati.
+    for path in sorted(glob.glob(os.path.join(out_dir, "scan_*.json")), reverse=True):
+        with open(path, encoding="utf-8") as f:
+            if json.load(f).get("results"): return path
+    return None
+
+
+def load_snapshot(summary_path):
+    # -> (tabel hasil, HistoryStore, ringkasan, waktu scan)
+    with open(summary_path, encoding="utf-8") as f: summary = json.load(f)
+    folder = os.path.dirname(summary_path)
+    table = pd.read_parquet(os.path.join(folder, summary["files"]["results"]))
+    history = HistoryStore.from_frame(pd.read_parquet(os.path.join(folder, summary["files"]["history"])))
+    return table, history, summary, datetime.fromisoformat(summary["scanned_at"])
+
+
+def prune_snapshots(keep, out_dir=SNAPSHOT_DIR):
+    for path in sorted(glob.glob(os.path.join(out_dir, "scan_*.json")))[:-keep or None]:
+        base = path[:-len(".json")]
+        for p in (path, base + ".parquet", base + "_history.parquet"):
+            if os.path.exists(p): os.remove(p)
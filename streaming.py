@@ -0,0 +1,236 @@
+# --- STATE INDIKATOR INKREMENTAL (MODE LIVE INTRADAY) ---
+# Disemai sekali dari panel riwayat, lalu tiap bar baru atau bar terakhir yang berubah diproses O(1) per
+# ticker: jumlah berjalan untuk MA20/MA50/Avg_Vol_5, akumulator gain/loss untuk RSI, ring buffer High untuk
+# swing window dan 6 bar terakhir untuk kandidat order block. Rumusnya sama dengan indicators.py / smc.py,
+# jadi Skor dan Structure identik dengan scan penuh pada data yang sama.
+import math
+import os
+import threading
+import time
+from collections import deque
+from datetime import datetime, timedelta, timezone
+
+import numpy as np
+import pandas as pd
+
+from data_provider import OHLCV_FIELDS, get_provider, make_panel, panel_ticker, panel_tickers
+from indicators import MIN_BARS, compute_indicators, stack_panel
+from result_store import HISTORY_COLUMNS, HistoryStore, compact_table
+from scan_engine import ScanEngine
+from scanner import SCAN_RATE, SCAN_RETRIES, SCAN_WORKERS, signal_table
+from smc import OB_BREAK, OB_LOOKAHEAD, SWING_WINDOW, last_order_block, swing_highs
+
+WIB = timezone(timedelta(hours=7))
+
+# --- KONFIGURASI MODE LIVE ---
+LIVE_INTERVAL = int(os.environ.get("LIVE_INTERVAL", 180))  # detik antar refresh bar intraday
+RSI_WINDOW = 14
+OB_TAIL = 6  # kandidat order block terbaru = bar ke-6 dari belakang (5 bar terakhir tidak dihitung)
+
+
+def gain_loss(prev, close):
+    # Satu langkah calculate_rsi: close NaN -> NaN, delta NaN (bar sebelumnya kosong) dihitung 0.
+    if math.isnan(close): return math.nan, math.nan
+    d = close - prev
+    return (d if d > 0 else 0.0), (-d if d < 0 else 0.0)
+
+
+class RollingMean:
+    # Setara rolling(window).mean() pada nilai terakhir. Jumlah window-1 nilai yang sudah final disimpan
+    # terpisah dari nilai terakhir, jadi bar intraday yang berubah-ubah tidak menumpuk galat pembulatan.
+    # NaN di jendela -> NaN; jendela konstan -> nilai itu persis (seperti pandas dan indicators.rolling_mean).
+    def __init__(self, window, values):
+        self.window = window
+        self.buf = deque(values[-window:], maxlen=window)
+        head = list(self.buf)[:-1]
+        self.total = math.fsum(x for x in head if not math.isnan(x))
+        self.nans = sum(math.isnan(x) for x in head)
+        self.run = 1  # panjang deret nilai sama yang berakhir di buf[-2]
+        while self.run < len(head) and head[-self.run - 1] == head[-1]: self.run += 1
+
+    def replace(self, x):
+        self.buf[-1] = x
+
+    def push(self, x):
+        first, last = self.buf[0], self.buf[-1]
+        self.run = self.run + 1 if last == self.buf[-2] else 1
+        if math.isnan(last): self.nans += 1
+        else: self.total += last
+        if math.isnan(first): self.nans -= 1
+        else: self.total -= first
+        self.buf.append(x)
+
+    def mean(self):
+        last = self.buf[-1]
+        if last == self.buf[-2] and self.run + 1 >= self.window: return last
+        if self.nans or math.isnan(last): return math.nan
+        return (self.total + last) / self.window
+
+
+class TickerState:
+    def __init__(self, date, o, h, l, c, v, swings, ob):
+        # o..v: list bar milik ticker ini saja (>= MIN_BARS), swings: mask swing_highs untuk bar yang sama,
+        # ob: (low, high) order block terakhir atau (NaN, NaN).
+        self.date = date
+        self.bar = (o[-1], h[-1], l[-1], c[-1], v[-1])
+        self.prev_close = c[-2]
+        self.ma20, self.ma50 = RollingMean(20, c), RollingMean(50, c)
+        self.avg_vol = RollingMean(5, v[:-1])  # Avg_Vol_5: lima volume sebelum bar terakhir
+        gl = [gain_loss(p, x) for p, x in zip(c[-RSI_WINDOW - 1:-1], c[-RSI_WINDOW:])]
+        self.gain = RollingMean(RSI_WINDOW, [g for g, _ in gl])
+        self.loss = RollingMean(RSI_WINDOW, [x for _, x in gl])
+        # Swing high di bar j baru final setelah bar j+2 final; kandidat di bar ke-3 dari belakang masih
+        # bergantung pada bar terakhir, jadi hanya dua swing final terakhir yang disimpan.
+        self.highs = deque(h[-SWING_WINDOW:], maxlen=SWING_WINDOW)
+        final = np.flatnonzero(swings[:len(c) - SWING_WINDOW // 2 - 1])
+        self.swings = deque([h[i] for i in final[-2:]], maxlen=2)
+        self.recent = deque(zip(o[-OB_TAIL:], h[-OB_TAIL:], l[-OB_TAIL:], c[-OB_TAIL:]), maxlen=OB_TAIL)
+        self.ob = ob
+        self.closed = []  # (tanggal, bar, indikator) bar yang menjadi final selama mode live, untuk chart
+
+    def pending_swing(self):
+        mid = self.highs[SWING_WINDOW // 2]
+        return all(x <= mid for x in self.highs)
+
+    def update(self, date, o, h, l, c, v):
+        # Tanggal sama = bar terakhir diperbarui, tanggal baru = bar ditambahkan. -> True bila state berubah.
+        bar = (o, h, l, c, v)
+        if date < self.date or (date == self.date and bar == self.bar): return False
+        if date == self.date:
+            for m in (self.ma20, self.ma50): m.replace(c)
+            for m, x in zip((self.gain, self.loss), gain_loss(self.prev_close, c)): m.replace(x)
+            self.highs[-1] = h
+            self.recent[-1] = bar[:4]
+        else:
+            self.closed.append((self.date, self.bar, self.indicators()))
+            if self.pending_swing(): self.swings.append(self.highs[SWING_WINDOW // 2])
+            self.highs.append(h)
+            before = self.recent[0][3]  # close bar sebelum kandidat OB baru
+            self.recent.append(bar[:4])
+            co, ch, cl, cc = self.recent[0]
+            if not math.isnan(before) and cc < co and self.recent[OB_LOOKAHEAD][3] > ch * OB_BREAK: self.ob = (cl, ch)
+            self.avg_vol.push(self.bar[4])
+            for m in (self.ma20, self.ma50): m.push(c)
+            for m, x in zip((self.gain, self.loss), gain_loss(self.bar[3], c)): m.push(x)
+            self.prev_close = self.bar[3]
+        self.date, self.bar = date, bar
+        return True
+
+    def structure(self):
+        swings = list(self.swings) + ([self.highs[SWING_WINDOW // 2]] if self.pending_swing() else [])
+        bos = len(swings) >= 2 and swings[-2] != 0 and self.bar[3] > swings[-2]
+        return "BOS Bullish" if bos else "Sideways/Retracement"
+
+    def indicators(self):
+        gain, loss = self.gain.mean(), self.loss.mean()
+        r = 100 - (100 / (1 + gain / loss)) if loss != 0 else math.nan
+        if math.isnan(r) and not math.isnan(self.bar[3]): r = 50.0
+        return {"MA20": self.ma20.mean(), "MA50": self.ma50.mean(), "RSI": r, "Avg_Vol_5": self.avg_vol.mean()}
+
+
+class LiveScanner:
+    # Satu instance per universe (app.py: st.cache_resource), dibagi semua sesi dan tidak diubah dari luar.
+    # refresh() mengambil bar sejak tanggal state tertua; tabel hanya diganti untuk ticker yang Skor atau
+    # Structure-nya berubah, dan version naik setiap kali ada perubahan. Ticker yang barnya belum mencapai
+    # MIN_BARS disimpan mentah (pending) dan bergabung ke tabel begitu barnya cukup.
+    def __init__(self, t_list, provider, meta, interval=LIVE_INTERVAL):
+        self.provider, self.meta, self.interval = provider, meta, interval
+        self.lock = threading.Lock()
+        self.states, self.history = {}, None
+        panel = provider.get_history(t_list)
+        self.pending = {t: panel_ticker(panel, t) for t in t_list}
+        tickers = self.join(list(self.pending))
+        self.table = compact_table(self.rows(tickers)) if tickers else None
+        self.version, self.changed = 0, ()
+        self.refreshed_at, self.updated_at = time.time(), datetime.now(WIB)
+
+    def __contains__(self, t):
+        return t in self.states
+
+    def join(self, tickers):
+        # Semai state + riwayat chart untuk ticker pending yang sudah punya >= MIN_BARS bar.
+        # -> ticker yang bergabung.
+        ready = [t for t in tickers if len(self.pending[t]) >= MIN_BARS]
+        if not ready: return []
+        arrays, ready, lengths = stack_panel(make_panel({t: self.pending.pop(t) for t in ready}), ready)
+        dates = arrays['Date']
+        o, h, l, c, v = (arrays[f] for f in OHLCV_FIELDS)
+        ind = compute_indicators(c, v)
+        history = HistoryStore.from_arrays(ready, lengths, dates, {'Open': o, 'High': h, 'Low': l, 'Close': c, 'Volume': v, **ind}, HISTORY_COLUMNS)
+        self.history = history if self.history is None else HistoryStore.concat([self.history, history])
+        swings = swing_highs(h)
+        _, ob_low, ob_high = last_order_block(o, h, l, c)
+        for i, t in enumerate(ready):
+            own = slice(c.shape[1] - lengths[i], None)
+            self.states[t] = TickerState(dates[i, -1], *(a[i, own].tolist() for a in (o, h, l, c, v)), swings[i, own],
+                                         (float(ob_low[i]), float(ob_high[i])))
+        return ready
+
+    def rows(self, tickers):
+        # Cukup dua kolom (bar sebelumnya, bar terakhir) untuk signal_table.
+        states = [self.states[t] for t in tickers]
+        close = np.array([[s.prev_close, s.bar[3]] for s in states])
+        volume = np.array([[np.nan, s.bar[4]] for s in states])
+        inds = [s.indicators() for s in states]
+        ind = {k: np.array([[np.nan, i[k]] for i in inds]) for k in inds[0]}
+        ob = np.array([s.ob for s in states])
+        return signal_table(tickers, close, volume, ind, np.array([s.structure() for s in states], dtype=object),
+                            ob[:, 0], ob[:, 1], self.meta)
+
+    def apply(self, panel):
+        # Terapkan bar dari panel (boleh memuat bar lama; yang sebelum tanggal state dilewati).
+        # -> tuple ticker yang Skor / Structure-nya berubah atau yang baru bergabung.
+        present = panel_tickers(panel)
+        for t in present:
+            if t not in self.pending: continue
+            old, new = self.pending[t], panel_ticker(panel, t)
+            self.pending[t] = pd.concat([old[~old.index.isin(new.index)], new]).sort_index() if len(old) else new
+        joined = self.join([t for t in present if t in self.pending])
+        arrays, tickers, lengths = stack_panel(panel, [t for t in present if t in self.states and t not in joined])
+        bars = np.stack([arrays[f] for f in OHLCV_FIELDS], axis=2).tolist()
+        dates, L = arrays['Date'], arrays['Date'].shape[1]
+        touched = []
+        for i, t in enumerate(tickers):
+            state = self.states[t]
+            hit = [state.update(dates[i, j], *bars[i][j]) for j in range(L - lengths[i], L)]
+            if any(hit): touched.append(t)
+        parts = [self.rows(joined)] if joined else []
+        if touched:
+            new = self.rows(touched)
+            cur = self.table.set_index('Ticker').loc[touched]
+            diff = (new['Skor'].to_numpy() != cur['Skor'].to_numpy()) | (new['Structure'].to_numpy() != cur['Structure'].to_numpy(dtype=object))
+            if diff.any(): parts.append(new[diff])
+        changed = tuple(t for part in parts for t in part['Ticker'])
+        if not changed: return ()
+        # Baris baru disamakan dulu dtype-nya dengan tabel; kolom yang seluruhnya NaN (mis. Jarak Entry tanpa
+        # order block) dengan dtype lain memicu FutureWarning pandas saat concat.
+        parts = [compact_table(p) for p in parts]
+        if self.table is not None: parts.insert(0, self.table[~self.table['Ticker'].isin(changed)])
+        self.table = compact_table(pd.concat(parts, ignore_index=True))
+        self.version += 1; self.changed = changed; self.updated_at = datetime.now(WIB)
+        return changed
+
+    def refresh(self, now=None):
+        # Paling sering sekali per ~interval (timer fragment bisa terpicu sedikit lebih awal). Sesi lain
+        # menunggu lock lalu langsung kembali; perubahan dibaca lewat version/table.
+        with self.lock:
+            now = now or time.time()
+            if not (self.states or self.pending) or now - self.refreshed_at < self.interval * 0.8: return ()
+            self.refreshed_at = now
+            since = pd.Timestamp(min(s.date for s in self.states.values())).date() if self.states else None
+            return self.apply(self.provider.get_history(list(self.states) + list(self.pending), start=since))
+
+    def frame(self, t):
+        # Riwayat chart saat seed + bar yang final selama mode live + bar terakhir (bisa intraday) dari state.
+        s = self.states[t]
+        rows = s.closed + [(s.date, s.bar, s.indicators())]
+        df = self.history.frame(t)
+        tail = pd.DataFrame([{**dict(zip(OHLCV_FIELDS, bar)), **ind} for _, bar, ind in rows],
+                            index=pd.DatetimeIndex([pd.Timestamp(d) for d, _, _ in rows], name="Date"))
+        return pd.concat([df[df.index < tail.index[0]], tail[df.columns]])
+
+
+def start_live(t_list, meta, interval=LIVE_INTERVAL):
+    # Cache OHLCV dianggap basi setelah setengah interval, jadi tiap refresh benar-benar mengambil bar intraday.
+    engine = ScanEngine(workers=SCAN_WORKERS, rate=SCAN_RATE, retries=SCAN_RETRIES)
+    return LiveScanner(t_list, get_provider(engine, intraday_ttl=interval // 2), meta, interval)